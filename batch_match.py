@@ -0,0 +1,164 @@
+"""Score resumes against a job from the command line, without the Streamlit UI.
+
+Usage examples:
+    python batch_match.py --job-id 3 resumes/ --output scores.jsonl
+    python batch_match.py --job-file job.txt "incoming/*.txt" --output scores.csv
+    python batch_match.py --job-id 3 candidates.jsonl --save-to-db --mode single_pass
+
+Resumes can be a directory of .txt files, a glob pattern, or a JSONL file whose lines hold a
+"resume" (or "resume_text"/"text") field plus optional "filename" and "username". Results are
+written as each resume finishes, to stdout by default. With --save-to-db, a candidate who already
+applied to the job has that application's score updated, so re-running a batch adds no duplicates.
+
+Resumes are batched through the model when transformers is installed; --workers only sets the
+thread count of the one-prompt-at-a-time fallback.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+
+OUTPUT_FIELDS = ["filename", "username", "match_score", "skills", "experience", "match_feedback", "error"]
+
+def iter_resumes(sources):
+    """Yield (filename, username, text) from directories, glob patterns and JSONL files"""
+    for source in sources:
+        if source.endswith(".jsonl"):
+            with open(source, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    text = record.get("resume") or record.get("resume_text") or record.get("text") or ""
+                    filename = record.get("filename") or record.get("id") or f"{os.path.basename(source)}:{line_number}"
+                    yield str(filename), record.get("username"), text
+            continue
+
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, "*.txt")))
+        else:
+            paths = sorted(glob.glob(source))
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                yield os.path.basename(path), None, f.read()
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def load_job(args):
+    """(job id or None, description, requirements) from --job-id or --job-file"""
+    if args.job_id is not None:
+        from database import get_job_by_id, init_db
+        init_db(sync_vector_indexes=False)
+        job = get_job_by_id(args.job_id)
+        if not job:
+            sys.exit(f"Job {args.job_id} not found")
+        return job[0], job[2], job[4]
+
+    with open(args.job_file, encoding="utf-8") as f:
+        description = f.read()
+    requirements = ""
+    if args.requirements_file:
+        with open(args.requirements_file, encoding="utf-8") as f:
+            requirements = f.read()
+    return None, description, requirements
+
+def open_writer(path, output_format):
+    """Return (write(row), close()) for a JSONL or CSV output stream"""
+    stream = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+
+    if output_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        def write(row):
+            writer.writerow(row)
+            stream.flush()
+    else:
+        def write(row):
+            stream.write(json.dumps({field: row.get(field) for field in OUTPUT_FIELDS}) + "\n")
+            stream.flush()
+
+    def close():
+        if stream is not sys.stdout:
+            stream.close()
+    return write, close
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score resumes against a job without the web UI.")
+    job = parser.add_mutually_exclusive_group(required=True)
+    job.add_argument("--job-id", type=int, help="id of a job in the portal database")
+    job.add_argument("--job-file", help="text file with the job description")
+    parser.add_argument("--requirements-file", help="text file with the job requirements (with --job-file)")
+    parser.add_argument("resumes", nargs="+", help="directories of .txt files, glob patterns or .jsonl files")
+    parser.add_argument("--output", default="-", help="output file (.jsonl or .csv), '-' for stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="resumes analyzed in parallel when batched inference is unavailable "
+                             "(default: CPU count; ignored when batching, which sizes batches itself)")
+    parser.add_argument("--mode", choices=["multi_call", "single_pass"], default="multi_call",
+                        help="multi_call: separate skills, experience and match calls per resume; "
+                             "single_pass: one combined call per resume")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="resumes read into memory at a time")
+    parser.add_argument("--save-to-db", action="store_true",
+                        help="also store the scored resumes as applications to --job-id, "
+                             "updating a candidate's existing application to it")
+    args = parser.parse_args(argv)
+    if args.save_to_db and args.job_id is None:
+        parser.error("--save-to-db needs --job-id")
+    if args.requirements_file and not args.job_file:
+        parser.error("--requirements-file only applies to --job-file")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_format = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    job_id, description, requirements = load_job(args)
+
+    # Imported late so --help and argument errors stay instant
+    from engine import iter_bulk_resumes
+
+    write, close = open_writer(args.output, output_format)
+    scored = failed = 0
+    started = time.monotonic()
+    try:
+        for chunk in _chunks(iter_resumes(args.resumes), args.chunk_size):
+            resumes = [(filename, text) for filename, _, text in chunk]
+            to_save = []
+            for idx, result in iter_bulk_resumes(resumes, description, requirements, args.workers, args.mode):
+                filename, username, text = chunk[idx]
+                username = username or os.path.splitext(filename)[0].replace("_", " ")
+                write({**result, "username": username})
+
+                if "error" in result:
+                    failed += 1
+                    continue
+                scored += 1
+                if args.save_to_db:
+                    to_save.append((username, job_id, text, result["skills"], result["experience"],
+                                    result["match_score"], result["match_feedback"]))
+
+            # One transaction per chunk
+            if to_save:
+                from database import save_scored_applications
+                save_scored_applications(to_save)
+
+            elapsed = time.monotonic() - started
+            print(f"{scored + failed} resumes ({failed} failed) in {elapsed:.1f}s, "
+                  f"{(scored + failed) / elapsed:.2f}/s", file=sys.stderr)
+    finally:
+        close()
+
+    return 1 if failed and not scored else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
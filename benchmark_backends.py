@@ -0,0 +1,113 @@
+"""Compare inference backends on hr_dataset.csv: load time, memory, latency and score agreement.
+
+Usage: python benchmark_backends.py [--backends teapot int8 onnx] [--repeat 3] [--json results.json]
+
+Every backend scores each resume/job pair with the match prompt, bypassing the output cache.
+The first backend is the reference: the others are reported by how far their scores drift from
+it and how often they reach the same match/no-match decision. Accuracy is against the dataset's
+labels, counting a score at or above --threshold as a match.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+from engine import BACKENDS, TEAPOT, INT8, load_model
+from engine.analysis import MATCH_QUERY, match_context, parse_match_output
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hr_dataset.csv")
+
+def load_dataset(path=DATASET_PATH):
+    """(resume, job description, label) rows"""
+    with open(path, encoding="utf-8", newline="") as f:
+        return [(row["resume_text"], row["job_description"], int(row["label"])) for row in csv.DictReader(f)]
+
+def resident_memory():
+    """Current resident set size in bytes (Linux), or None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def benchmark_backend(backend, rows, repeat):
+    """Load one backend and time the match prompt on every row"""
+    gc.collect()
+    memory_before = resident_memory()
+    started = time.perf_counter()
+    model = load_model(backend)
+    load_seconds = time.perf_counter() - started
+    memory_after = resident_memory()
+
+    latencies = []
+    scores = []
+    for resume, job_description, _ in rows:
+        context = match_context(resume, job_description, "")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = model.query(query=MATCH_QUERY, context=context)
+            latencies.append(time.perf_counter() - started)
+        scores.append(parse_match_output(output)["score"])
+
+    del model
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "memory_mb": (memory_after - memory_before) / 2**20 if memory_before is not None else None,
+        "latency_mean": statistics.mean(latencies),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "scores": scores,
+    }
+
+def compare(results, rows, threshold):
+    """Add accuracy and, for every backend after the first, agreement with the first"""
+    labels = [label for _, _, label in rows]
+    reference = results[0]["scores"]
+    for result in results:
+        decisions = [score >= threshold for score in result["scores"]]
+        result["accuracy"] = sum(decision == bool(label) for decision, label in zip(decisions, labels)) / len(labels)
+        result["mean_abs_score_diff"] = statistics.mean(abs(a - b) for a, b in zip(result["scores"], reference))
+        result["decision_agreement"] = sum(
+            decision == (score >= threshold) for decision, score in zip(decisions, reference)) / len(labels)
+
+def print_table(results):
+    print(f"{'backend':<8} {'load s':>7} {'RSS MB':>7} {'mean s':>7} {'p50 s':>7} {'p95 s':>7} "
+          f"{'accuracy':>8} {'|Δscore|':>8} {'agree':>6}")
+    for r in results:
+        memory = f"{r['memory_mb']:7.0f}" if r["memory_mb"] is not None else f"{'n/a':>7}"
+        print(f"{r['backend']:<8} {r['load_seconds']:7.1f} {memory} {r['latency_mean']:7.3f} {r['latency_p50']:7.3f} "
+              f"{r['latency_p95']:7.3f} {r['accuracy']:8.0%} {r['mean_abs_score_diff']:8.1f} {r['decision_agreement']:6.0%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare inference backends on the labelled HR dataset.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=[TEAPOT, INT8],
+                        help="backends to run; the first is the reference (default: teapot int8)")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="CSV with resume_text, job_description and label")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per pair")
+    parser.add_argument("--threshold", type=float, default=60.0, help="score counted as a predicted match")
+    parser.add_argument("--json", help="also write the full results, including per-pair scores, here")
+    args = parser.parse_args(argv)
+
+    rows = load_dataset(args.dataset)
+    results = []
+    for backend in args.backends:
+        print(f"Running {backend} on {len(rows)} pairs...", file=sys.stderr)
+        results.append(benchmark_backend(backend, rows, args.repeat))
+    compare(results, rows, args.threshold)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Time every database.py function and every inline SQL query in views/ against a (seeded) database.
+
+Usage: python benchmark_database.py [--db seeded.db] [--repeat 5] [--writes] [--json results.json]
+
+Each case runs once to warm the page cache, then --repeat timed times. The SQL statements it ran
+are captured with their bound values and printed under the timing with their EXPLAIN QUERY PLAN,
+so a slow call points straight at its plan. Fill the database first with seed_database.py.
+Write functions only run with --writes, because they add rows to the database.
+A --db other than the portal's uses its own similarity index beside the file, built if missing.
+"""
+import argparse
+import inspect
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+
+import database
+from check_query_plans import collect_queries
+
+# Statements worth explaining (transaction control and pragmas are not)
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s", re.IGNORECASE)
+# Calls slower than this are flagged in the report
+SLOW_MS = 100
+
+# Functions with no SQL of their own, or only reachable through other cases
+NOT_BENCHMARKED = {
+    "get_connection": "connection pool plumbing",
+    "close_connections": "connection pool plumbing",
+    "init_db": "migrations, run once at startup",
+    "invalidate_job_facets": "clears an in-process cache",
+    "invalidate_recommendations": "clears an in-process cache",
+    "link_application_skills": "runs inside apply_to_job",
+    "link_job_skills": "runs inside post_job",
+}
+
+_statements = []
+
+def _traced_connect(connect):
+    def wrapper():
+        conn = connect()
+        conn.set_trace_callback(_statements.append)
+        return conn
+    return wrapper
+
+def sample_values(conn):
+    """Busy but real ids and names to call the functions with"""
+    job_id = conn.execute("""SELECT job_id FROM job_stats /* full-scan: benchmark setup */
+                             ORDER BY application_count DESC LIMIT 1""").fetchone()
+    if job_id is None:
+        sys.exit("The database has no jobs; fill it with seed_database.py first")
+    job_id = job_id[0]
+    employer = conn.execute("SELECT posted_by FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    application_ids = [row[0] for row in conn.execute(
+        "SELECT id FROM applications WHERE job_id = ? ORDER BY id LIMIT 50", (job_id,))]
+    candidate = conn.execute("SELECT username FROM applications WHERE id = ?",
+                             (application_ids[0],)).fetchone()[0] if application_ids else "nobody"
+    run_id = conn.execute("SELECT MAX(id) FROM bulk_runs").fetchone()[0] or 0
+    return {
+        "job_id": job_id,
+        "employer": employer,
+        "candidate": candidate,
+        "application_id": application_ids[0] if application_ids else 0,
+        "application_ids": application_ids,
+        "run_id": run_id,
+        "location": conn.execute("SELECT location FROM jobs WHERE id = ?", (job_id,)).fetchone()[0],
+    }
+
+def read_cases(s):
+    """(name, call) for every read-only function; the name starts with the function it times"""
+    def fresh_recommendations():
+        database.invalidate_recommendations(s["candidate"])
+        return database.get_recommended_jobs(s["candidate"])
+
+    def fresh_facets():
+        database.invalidate_job_facets()
+        return database.get_job_facets()
+
+    cases = [
+        ("login_user", lambda: database.login_user(s["candidate"], "password")),
+        ("get_user_info", lambda: database.get_user_info(s["candidate"])),
+        ("get_job_by_id", lambda: database.get_job_by_id(s["job_id"])),
+        ("get_jobs_by_employer", lambda: database.get_jobs_by_employer(s["employer"])),
+        ("get_jobs_page", lambda: database.get_jobs_page()),
+        ("get_jobs_page location", lambda: database.get_jobs_page(location=s["location"])),
+        ("get_job_facets", fresh_facets),
+        ("get_job_stats", lambda: database.get_job_stats(s["job_id"])),
+        ("search_jobs", lambda: database.search_jobs("python developer")),
+        ("get_job_skills", lambda: database.get_job_skills(s["job_id"])),
+        ("get_skill_gaps_by_job", lambda: database.get_skill_gaps_by_job(s["job_id"])),
+        ("get_top_candidates_for_job", lambda: database.get_top_candidates_for_job(s["job_id"])),
+        ("get_applications_by_job_page", lambda: database.get_applications_by_job_page(s["job_id"])),
+        ("get_applications_by_job_page status",
+         lambda: database.get_applications_by_job_page(s["job_id"], status="Interview")),
+        ("get_applications_by_user_page", lambda: database.get_applications_by_user_page(s["candidate"])),
+        ("get_applications_by_employer_page", lambda: database.get_applications_by_employer_page(s["employer"])),
+        ("get_applications_by_employer_page job",
+         lambda: database.get_applications_by_employer_page(s["employer"], job_id=s["job_id"], status="Pending")),
+        ("get_application_status_counts_by_job", lambda: database.get_application_status_counts_by_job(s["job_id"])),
+        ("get_application_status_counts_by_user", lambda: database.get_application_status_counts_by_user(s["candidate"])),
+        ("get_application_skills", lambda: database.get_application_skills(s["application_ids"])),
+        ("get_scoring_pending", lambda: database.get_scoring_pending(s["application_ids"])),
+        ("get_unscored_application_ids", lambda: database.get_unscored_application_ids()),
+        ("get_employer_dashboard_metrics", lambda: database.get_employer_dashboard_metrics(s["employer"])),
+        ("get_candidate_dashboard_metrics", lambda: database.get_candidate_dashboard_metrics(s["candidate"])),
+        ("get_top_skills_by_employer", lambda: database.get_top_skills_by_employer(s["employer"])),
+        ("get_recommended_jobs", fresh_recommendations),
+        ("get_bulk_run", lambda: database.get_bulk_run(s["run_id"])),
+        ("get_bulk_runs_by_employer", lambda: database.get_bulk_runs_by_employer(s["employer"])),
+        ("get_bulk_run_results", lambda: database.get_bulk_run_results(s["run_id"])),
+        ("get_bulk_run_failures", lambda: database.get_bulk_run_failures(s["run_id"])),
+        ("get_pending_bulk_items", lambda: database.get_pending_bulk_items(s["run_id"])),
+        ("get_unfinished_bulk_run_ids", lambda: database.get_unfinished_bulk_run_ids()),
+        ("parse_salary_range", lambda: database.parse_salary_range("$60K-80K")),
+    ]
+    for sort in database.JOB_SORTS:
+        query = "python developer" if sort == "relevance" else None
+        cases.append((f"browse_jobs {sort}", lambda sort=sort, query=query: database.browse_jobs(query=query, sort=sort)))
+    return cases
+
+def write_cases(s):
+    """Cases that add or change rows; each call leaves its rows behind"""
+    counter = iter(range(10**9))
+    resume = "Backend developer with 6 years of experience using python, sql and docker."
+    scored = (s["candidate"], s["job_id"], resume, "Python, SQL, Docker", "Six years.", 70.0, "Good fit.")
+
+    def new_bulk_run():
+        s["run_id"] = database.create_bulk_run(s["employer"], s["job_id"], "multi_call", 1,
+                                               [("a.txt", resume, None), ("b.txt", resume, None)])
+        return s["run_id"]
+
+    def save_bulk_item():
+        item_id = database.get_pending_bulk_items(s["run_id"])
+        if item_id:
+            database.save_bulk_item_result(s["run_id"], item_id[0][0], {
+                "skills": "Python", "experience": "Six years.", "match_score": 70.0, "match_feedback": "Good fit."})
+
+    return [
+        ("register_user", lambda: database.register_user(f"benchmark{time.time_ns()}_{next(counter)}", "password",
+                                                         "benchmark@example.com")),
+        ("post_job", lambda: database.post_job("Benchmark Engineer", "Build things with python.", s["employer"],
+                                               "python, sql", "$90K-120K", s["location"], "Full-time")),
+        ("apply_to_job", lambda: database.apply_to_job(*scored)),
+        ("save_scored_applications", lambda: database.save_scored_applications([scored] * 10)),
+        ("update_job_status", lambda: database.update_job_status(s["application_id"], "Interview")),
+        # get_application_for_scoring marks the row as being scored; the cases after it move the row
+        # on, and save_application_score runs last so the row ends up scored rather than re-queued
+        # (and re-scored) at the next app start
+        ("get_application_for_scoring", lambda: database.get_application_for_scoring(s["application_id"])),
+        ("mark_scoring_failed", lambda: database.mark_scoring_failed(s["application_id"], "benchmark")),
+        ("retry_scoring", lambda: database.retry_scoring(s["application_id"])),
+        ("save_application_score", lambda: database.save_application_score(s["application_id"], "Python", "Six years.",
+                                                                           71.0, "Good fit.")),
+        ("create_bulk_run", new_bulk_run),
+        ("save_bulk_item_result", save_bulk_item),
+        ("finish_bulk_run", lambda: database.finish_bulk_run(s["run_id"])),
+        ("fail_bulk_run", lambda: database.fail_bulk_run(s["run_id"], "benchmark")),
+        ("reopen_bulk_run", lambda: database.reopen_bulk_run(s["run_id"])),
+    ]
+
+def view_cases(s):
+    """Inline SQL from views/, with each ? filled from the column it is compared to"""
+    values = {"posted_by": s["employer"], "username": s["candidate"], "job_id": s["job_id"], "id": s["job_id"]}
+    cases = []
+    for location, sql in collect_queries():
+        if not location.startswith("views"):
+            continue
+        params = [values.get(column.split(".")[-1]) for column in re.findall(r"([\w.]+)\s*=\s*\?", sql)]
+        cases.append((location, sql, params))
+    return cases
+
+def explain(conn, sql, params=()):
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    except sqlite3.Error as e:
+        return [f"(could not explain: {e})"]
+
+def time_case(call, repeat):
+    """Warm up, then return (timings in ms, statements run by the last call)"""
+    call()
+    timings = []
+    for _ in range(repeat):
+        _statements.clear()
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    statements = list(dict.fromkeys(sql for sql in _statements if EXPLAINABLE.match(sql)))
+    return timings, statements
+
+def report(name, timings, statements, explain_conn):
+    median = statistics.median(timings)
+    flag = "  SLOW" if median >= SLOW_MS else ""
+    print(f"{name:<45} median {median:9.2f} ms   max {max(timings):9.2f} ms{flag}")
+    plans = []
+    for sql in statements:
+        plan = explain(explain_conn, sql)
+        plans.append({"sql": sql, "plan": plan})
+        print(f"    {' '.join(sql.split())[:150]}")
+        for line in plan:
+            print(f"        {line}")
+    return {"name": name, "median_ms": median, "min_ms": min(timings), "max_ms": max(timings), "statements": plans}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the portal's database access at scale.")
+    parser.add_argument("--db", default=database.DB_PATH, help="database to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per case")
+    parser.add_argument("--writes", action="store_true", help="also time functions that add or change rows")
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist")
+
+    # Similarity searches must read this database's index, not the portal's
+    import vector_index
+    vector_index.INDEX_DIR = vector_index.index_dir_for(args.db)
+    database.close_connections()
+    database.DB_PATH = args.db
+    # Traced before anything opens a pooled connection, since the cases reuse the pool's connections
+    database._connect = _traced_connect(database._connect)
+    print(f"Checking the similarity index in {vector_index.INDEX_DIR}...")
+    vector_index.ensure_indexes().join()
+    explain_conn = sqlite3.connect(args.db)
+    s = sample_values(explain_conn)
+    print(f"Sample job {s['job_id']}, employer {s['employer']}, candidate {s['candidate']}\n")
+
+    results = {"db": os.path.abspath(args.db), "repeat": args.repeat, "functions": [], "views": []}
+    cases = read_cases(s) + (write_cases(s) if args.writes else [])
+    for name, call in cases:
+        timings, statements = time_case(call, args.repeat)
+        results["functions"].append(report(name, timings, statements, explain_conn))
+
+    print("\nInline SQL in views/")
+    for location, sql, params in view_cases(s):
+        timings, _ = time_case(lambda: explain_conn.execute(sql, params).fetchall(), args.repeat)
+        result = report(location, timings, [], explain_conn)
+        plan = explain(explain_conn, sql, params)
+        print(f"    {' '.join(sql.split())[:150]}")
+        for line in plan:
+            print(f"        {line}")
+        result["statements"] = [{"sql": sql, "plan": plan}]
+        results["views"].append(result)
+
+    # Anything public in database.py without a case is called out rather than silently missed
+    covered = {name.split()[0] for name, _ in cases} | set(NOT_BENCHMARKED)
+    functions = {name for name, f in inspect.getmembers(database, inspect.isfunction)
+                 if f.__module__ == "database" and not name.startswith("_")}
+    print()
+    for name in sorted(functions - covered):
+        print(f"not benchmarked: {name}" + (" (write; run with --writes)" if not args.writes else ""))
+    for name, reason in sorted(NOT_BENCHMARKED.items()):
+        print(f"skipped: {name} ({reason})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
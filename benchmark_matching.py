@@ -0,0 +1,227 @@
+"""Accuracy and speed of resume/job matching on a labelled dataset, written to JSON for comparison.
+
+Usage:
+    python benchmark_matching.py run [--modes multi_call cached single_pass batched] [--backend int8]
+                                     [--dataset hr_dataset.csv] [--limit 500] [--output results.json]
+    python benchmark_matching.py synthesize --rows 100000 --output synthetic.csv
+
+Modes:
+    multi_call   match_resume_to_job on each pair, cold output cache
+    cached       the same calls again once the cache holds every answer
+    single_pass  the one-call analysis, reading the score out of the structured answer
+    batched      the match prompts of each chunk through the batched pipeline
+
+The dataset is streamed in chunks, so large synthetic files don't have to fit in memory. Scores
+are compared with the labels through ROC AUC and accuracy at fixed thresholds. Latency is per
+pair (for batched, the batch time divided by its size), with peak RSS for the whole process.
+Answers are cached in a throwaway database, never the portal's.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import model_cache
+from engine import BACKENDS, TEAPOT
+from benchmark_backends import DATASET_PATH, percentile
+
+MODES = ("multi_call", "cached", "single_pass", "batched")
+THRESHOLDS = (40, 50, 60, 70, 80)
+CHUNK_SIZE = 256
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE, limit=None):
+    """Lists of (resume, job description, label) rows, read lazily from the CSV"""
+    chunk = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for count, row in enumerate(csv.DictReader(f)):
+            if limit is not None and count >= limit:
+                break
+            chunk.append((row["resume_text"], row["job_description"], int(row["label"])))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def roc_auc(scores, labels):
+    """Probability a random positive outscores a random negative (ties count half), or None"""
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+
+    # Mann-Whitney U from average ranks
+    order = sorted(range(len(scores)), key=scores.__getitem__)
+    ranks = [0.0] * len(scores)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and scores[order[j + 1]] == scores[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    positive_rank_sum = sum(rank for rank, label in zip(ranks, labels) if label)
+    return (positive_rank_sum - positives * (positives + 1) / 2) / (positives * negatives)
+
+def threshold_accuracy(scores, labels, thresholds=THRESHOLDS):
+    return {str(threshold): sum((score >= threshold) == bool(label) for score, label in zip(scores, labels)) / len(labels)
+            for threshold in thresholds}
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if platform.system() == "Darwin" else 2**10)
+
+def _score_chunk(mode, chunk, latencies):
+    """Match scores for one chunk of rows, appending per-pair latencies"""
+    from engine import SINGLE_PASS, match_resume_to_job, analyze_resume, query_many
+    from engine.analysis import MATCH_QUERY, match_context, parse_match_output
+
+    if mode == "batched":
+        started = time.perf_counter()
+        outputs = query_many([(MATCH_QUERY, match_context(resume, job, "")) for resume, job, _ in chunk])
+        latencies.extend([(time.perf_counter() - started) / len(chunk)] * len(chunk))
+        return [parse_match_output(output)["score"] for output in outputs]
+
+    scores = []
+    for resume, job, _ in chunk:
+        started = time.perf_counter()
+        if mode == "single_pass":
+            score = analyze_resume(resume, job, "", SINGLE_PASS)["score"]
+        else:
+            score = match_resume_to_job(resume, job, "")["score"]
+        latencies.append(time.perf_counter() - started)
+        scores.append(score)
+    return scores
+
+def run_mode(mode, dataset, limit, chunk_size):
+    """Stream the dataset through one mode and summarise accuracy and speed"""
+    if mode == "cached":
+        # Fill the cache untimed (all hits already if multi_call just ran)
+        for chunk in iter_chunks(dataset, chunk_size, limit):
+            _score_chunk("multi_call", chunk, [])
+    else:
+        model_cache.invalidate()
+
+    scores, labels, latencies = [], [], []
+    started = time.perf_counter()
+    for chunk in iter_chunks(dataset, chunk_size, limit):
+        scores += _score_chunk(mode, chunk, latencies)
+        labels += [label for _, _, label in chunk]
+        print(f"  {mode}: {len(scores)} pairs", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "pairs": len(scores),
+        "auc": roc_auc(scores, labels),
+        "accuracy": threshold_accuracy(scores, labels),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "throughput": len(scores) / elapsed if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def run(args):
+    import engine.model
+    engine.model.BACKEND = args.backend
+    model_cache.CACHE_PATH = os.path.join(tempfile.mkdtemp(prefix="benchmark_cache_"), "cache.db")
+
+    results = {
+        "dataset": os.path.abspath(args.dataset),
+        "limit": args.limit,
+        "backend": args.backend,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "modes": [],
+    }
+    for mode in args.modes:
+        print(f"Running {mode}...", file=sys.stderr)
+        results["modes"].append(run_mode(mode, args.dataset, args.limit, args.chunk_size))
+
+    print(f"{'mode':<12} {'pairs':>6} {'AUC':>5} {'acc@60':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'pairs/s':>8} {'RSS MB':>7}")
+    for r in results["modes"]:
+        auc = f"{r['auc']:5.2f}" if r["auc"] is not None else f"{'n/a':>5}"
+        print(f"{r['mode']:<12} {r['pairs']:>6} {auc} {r['accuracy']['60']:6.0%} {r['latency_p50']:7.3f} "
+              f"{r['latency_p95']:7.3f} {r['latency_p99']:7.3f} {r['throughput']:8.2f} {r['peak_rss_mb']:7.0f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+# Roles for synthetic pairs: a matching resume shares the role and most of its skills
+SYNTHETIC_ROLES = {
+    "backend developer": ["Python", "Java", "SQL", "REST APIs", "Docker", "AWS", "microservices"],
+    "frontend developer": ["JavaScript", "React", "HTML", "CSS", "TypeScript", "responsive design"],
+    "data scientist": ["Python", "machine learning", "SQL", "statistics", "data visualization", "pandas"],
+    "data engineer": ["Spark", "Kafka", "Airflow", "SQL", "Python", "data pipelines"],
+    "project manager": ["agile", "Scrum", "risk management", "stakeholder management", "budgeting"],
+    "marketing specialist": ["SEO", "social media", "content strategy", "digital marketing", "analytics"],
+    "accountant": ["financial reporting", "tax compliance", "auditing", "Excel", "bookkeeping"],
+    "graphic designer": ["Adobe Illustrator", "Photoshop", "branding", "UI/UX", "typography"],
+    "customer support specialist": ["communication", "CRM", "problem solving", "ticketing", "customer service"],
+    "teacher": ["curriculum development", "student engagement", "lesson planning", "assessment"],
+}
+
+def synthetic_pair(rng):
+    """One (resume, job description, label) pair; about half are matches"""
+    job_role = rng.choice(list(SYNTHETIC_ROLES))
+    label = rng.random() < 0.5
+    resume_role = job_role if label else rng.choice([role for role in SYNTHETIC_ROLES if role != job_role])
+
+    resume_skills = rng.sample(SYNTHETIC_ROLES[resume_role], k=min(4, len(SYNTHETIC_ROLES[resume_role])))
+    job_skills = rng.sample(SYNTHETIC_ROLES[job_role], k=3)
+    years = rng.randint(1, 15)
+    resume = (f"{rng.choice(['Experienced', 'Certified', 'Senior', 'Motivated'])} {resume_role} with {years} years "
+              f"of experience in {', '.join(resume_skills[:-1])} and {resume_skills[-1]}.")
+    article = "an" if job_role[0] in "aeiou" else "a"
+    job = (f"{rng.choice(['Hiring', 'Seeking', 'Looking for'])} {article} {job_role} with experience in "
+           f"{', '.join(job_skills[:-1])} and {job_skills[-1]}.")
+    return resume, job, int(label)
+
+def synthesize(args):
+    """Write the original dataset followed by generated pairs, up to --rows in total"""
+    rng = random.Random(args.seed)
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["resume_text", "job_description", "label"])
+        written = 0
+        for chunk in iter_chunks(DATASET_PATH, limit=args.rows):
+            writer.writerows(chunk)
+            written += len(chunk)
+        for _ in range(args.rows - written):
+            writer.writerow(synthetic_pair(rng))
+    print(f"Wrote {args.rows} pairs to {args.output}", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume matching on labelled pairs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="score the dataset and write a JSON report")
+    run_parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    run_parser.add_argument("--backend", choices=BACKENDS, default=TEAPOT, help="inference backend")
+    run_parser.add_argument("--dataset", default=DATASET_PATH)
+    run_parser.add_argument("--limit", type=int, help="only the first N pairs")
+    run_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="pairs read and batched at a time")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.set_defaults(handler=run)
+
+    synth_parser = commands.add_parser("synthesize", help="write a larger labelled dataset")
+    synth_parser.add_argument("--rows", type=int, default=100000, help="total pairs, original rows included")
+    synth_parser.add_argument("--seed", type=int, default=0)
+    synth_parser.add_argument("--output", default="synthetic_dataset.csv")
+    synth_parser.set_defaults(handler=synthesize)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import logging
+import threading
+import metrics
+from engine import iter_bulk_resumes, read_resume_file, wait_until_ready
+from database import (create_bulk_run, get_bulk_run, get_job_by_id, get_pending_bulk_items, save_bulk_item_result,
+                      finish_bulk_run, fail_bulk_run, reopen_bulk_run, get_unfinished_bulk_run_ids)
+
+logger = logging.getLogger(__name__)
+
+# Runs being processed by this server process, keyed by run id
+_active = {}
+_active_lock = threading.Lock()
+_recovered = False
+
+def start_bulk_run(employer, job_id, resume_files, mode, max_workers=None):
+    """Store the uploaded files as a new run and start analyzing them in the background"""
+    resumes = []
+    for resume_file in resume_files:
+        try:
+            filename, text = read_resume_file(resume_file)
+            resumes.append((filename, text, None))
+        except Exception as e:
+            resumes.append((resume_file.name, None, str(e)))
+
+    run_id = create_bulk_run(employer, job_id, mode, max_workers, resumes)
+    resume_bulk_run(run_id)
+    return run_id
+
+def resume_bulk_run(run_id):
+    """Analyze whatever files of a run are still pending, unless this process is already on it"""
+    with _active_lock:
+        if run_id in _active:
+            return
+        reopen_bulk_run(run_id)
+        worker = threading.Thread(target=_process_run, args=(run_id,), name=f"bulk-run-{run_id}", daemon=True)
+        _active[run_id] = worker
+    worker.start()
+
+def is_active(run_id):
+    return run_id in _active
+
+metrics.register_gauge("bulk_runs.active", lambda: len(_active))
+
+def _process_run(run_id):
+    try:
+        run = get_bulk_run(run_id)
+        job = get_job_by_id(run[2])
+        items = get_pending_bulk_items(run_id)
+        wait_until_ready()
+
+        # Every finished file is committed on its own, so a restart loses at most the files in flight
+        resumes = [(filename, text) for _, filename, text in items]
+        for idx, result in iter_bulk_resumes(resumes, job[2], job[4], run[5], run[4]):
+            save_bulk_item_result(run_id, items[idx][0], result)
+
+        finish_bulk_run(run_id)
+    except Exception as e:
+        # Left 'running' the run would look busy forever; 'failed' lets the UI offer a resume
+        logger.exception("Bulk run %s failed", run_id)
+        fail_bulk_run(run_id, e)
+    finally:
+        with _active_lock:
+            _active.pop(run_id, None)
+
+def resume_interrupted_runs():
+    """Pick up runs a previous server process left unfinished (once per process)"""
+    global _recovered
+    with _active_lock:
+        if _recovered:
+            return
+        _recovered = True
+    for run_id in get_unfinished_bulk_run_ids():
+        resume_bulk_run(run_id)
@@ -0,0 +1,125 @@
+"""Fail when any SQL query in the app falls back to a full table scan.
+
+Usage: python check_query_plans.py
+
+Every SQL string literal in the app's modules, plus each variant of the queries
+database.py assembles at runtime, is run through EXPLAIN QUERY PLAN against a
+fresh in-memory database built by the migrations (plus the model output cache).
+"""
+import ast
+import itertools
+import os
+import re
+import sqlite3
+import sys
+
+from migrations import apply_migrations
+from model_cache import init_cache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SQL_STATEMENT = re.compile(r"^(SELECT|UPDATE|DELETE|WITH)\s")
+SKIP_DIRS = {"__pycache__", ".git", "venv", ".venv"}
+
+# Queries that are meant to read everything (e.g. one-off backfills) say so in a comment
+FULL_SCAN_MARKER = "/* full-scan:"
+# Scans that never read a whole table: virtual tables, constant rows and index-only reads
+ALLOWED_SCAN = re.compile(r"VIRTUAL TABLE|CONSTANT ROW|USING COVERING INDEX")
+# Walking a non-covering index is only acceptable when the query stops early
+INDEX_SCAN = re.compile(r"USING (INDEX|INTEGER PRIMARY KEY)")
+LIMIT_CLAUSE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+def iter_source_files():
+    """Yield every Python source file in the app"""
+    for dirpath, dirnames, filenames in os.walk(ROOT):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+def collect_queries():
+    """Collect (location, sql) for every SQL string literal in the app"""
+    queries = []
+    for path in iter_source_files():
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        # Fragments of f-strings are covered by collect_built_queries()
+        fragments = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for part in node.values}
+        for node in ast.walk(tree):
+            if id(node) in fragments:
+                continue
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                sql = node.value.strip()
+                if SQL_STATEMENT.match(sql):
+                    location = f"{os.path.relpath(path, ROOT)}:{node.lineno}"
+                    queries.append((location, sql))
+    return queries
+
+def collect_built_queries():
+    """Collect every variant of the queries database.py assembles at runtime"""
+    import database
+
+    queries = []
+    cursors = [None, ("x", 1)]
+    for cursor, query, location, job_type, sort in itertools.product(
+            cursors, [None, "x"], [None, "x"], [None, "x"], database.JOB_SORTS):
+        sql, _ = database._browse_jobs_query(10, cursor, query, location, job_type, sort)
+        queries.append(("database.py:_browse_jobs_query", sql))
+    # Score-ordered pages also have cursors into the rows that are still being scored
+    for cursor, status in itertools.product(cursors + [database.UNSCORED_CURSOR, (None, 1)], [None, "x"]):
+        sql, _ = database._applications_by_job_query(1, 10, cursor, status)
+        queries.append(("database.py:_applications_by_job_query", sql))
+        sql, _ = database._applications_by_user_query("x", 10, cursor, status)
+        queries.append(("database.py:_applications_by_user_query", sql))
+        for job_id in [None, 1]:
+            sql, _ = database._applications_by_employer_query("x", 10, cursor, job_id, status)
+            queries.append(("database.py:_applications_by_employer_query", sql))
+    return queries
+
+def explain(conn, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    params = [None] * sql.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def find_table_scans(sql, plan):
+    """Return the plan lines that read a whole table"""
+    scans = []
+    for line in plan:
+        if not line.startswith("SCAN") or ALLOWED_SCAN.search(line):
+            continue
+        if INDEX_SCAN.search(line) and LIMIT_CLAUSE.search(sql):
+            continue
+        scans.append(line)
+    return scans
+
+def check_queries(conn, queries):
+    """Explain every query and return a list of (location, sql, problem) failures"""
+    failures = []
+    for location, sql in queries:
+        if FULL_SCAN_MARKER in sql:
+            continue
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            failures.append((location, sql, f"error: {e}"))
+            continue
+        for line in find_table_scans(sql, plan):
+            failures.append((location, sql, line))
+    return failures
+
+def main():
+    conn = sqlite3.connect(":memory:")
+    apply_migrations(conn)
+    init_cache(conn)
+
+    queries = collect_queries() + collect_built_queries()
+    failures = check_queries(conn, queries)
+
+    print(f"Checked {len(queries)} queries")
+    for location, sql, problem in failures:
+        print(f"\n{location}: {problem}")
+        print("    " + " ".join(sql.split()))
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,161 +1,942 @@
 import sqlite3
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
 import streamlit as st
+from migrations import apply_migrations
+from skills import extract_skills
+import vector_index
+import metrics
 
-# Database initialization and functions
-def init_db():
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    # Create tables with detailed schema
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                 username TEXT UNIQUE, 
-                 password TEXT, 
-                 is_admin INTEGER,
-                 email TEXT,
-                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS jobs (
-                 id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                 title TEXT, 
-                 description TEXT, 
-                 posted_by TEXT,
-                 requirements TEXT,
-                 salary_range TEXT,
-                 location TEXT,
-                 job_type TEXT,
-                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS applications (
-                 id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                 username TEXT, 
-                 job_id INTEGER, 
-                 resume TEXT, 
-                 extracted_skills TEXT, 
-                 extracted_exp TEXT, 
-                 match_score REAL,
-                 match_feedback TEXT,
-                 application_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                 status TEXT DEFAULT 'Pending',
-                 FOREIGN KEY(job_id) REFERENCES jobs(id),
-                 FOREIGN KEY(username) REFERENCES users(username))''')
-    
-    conn.commit()
+# Connection settings
+DB_PATH = "hr_match_portal.db"
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+# Pragmas applied to every pooled connection
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+]
+
+# Connection pool shared by every Streamlit session in this process
+_pool = queue.LifoQueue()
+_pool_lock = threading.Lock()
+_pool_created = 0
+
+def _connect():
+    """Open a new connection with the shared pragmas applied"""
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+def _acquire():
+    """Take an idle connection from the pool, opening one if the pool is not full"""
+    global _pool_created
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        pass
+
+    with _pool_lock:
+        if _pool_created < POOL_SIZE:
+            _pool_created += 1
+            try:
+                return _connect()
+            except Exception:
+                _pool_created -= 1
+                raise
+
+    # Pool is exhausted, wait for another session to hand a connection back
+    with metrics.timed("db.pool_wait"):
+        return _pool.get()
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection for the duration of a with-block"""
+    conn = _acquire()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # Never hand a connection back with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        _pool.put(conn)
+
+def close_connections():
+    """Close every idle pooled connection"""
+    global _pool_created
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+        with _pool_lock:
+            _pool_created -= 1
+
+# Database initialization and functions
+def init_db(sync_vector_indexes=True):
+    """Bring the database schema up to date.
+
+    Short-lived tools pass sync_vector_indexes=False: the index check runs in a background thread
+    that would be killed when they exit.
+    """
+    with get_connection() as conn:
+        apply_migrations(conn)
+    if sync_vector_indexes:
+        _sync_vector_indexes()
+
+@st.cache_resource(show_spinner=False)
+def _sync_vector_indexes():
+    """Check the resume/job vector indexes once per process; any rebuild runs in the background"""
+    vector_index.ensure_indexes()
+
 # User management functions
 def register_user(username, password, email, is_admin=False):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO users (username, password, is_admin, email) VALUES (?, ?, ?, ?)", 
-                (username, password, int(is_admin), email))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False  # Username already exists
+    with get_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("INSERT INTO users (username, password, is_admin, email) VALUES (?, ?, ?, ?)",
+                    (username, password, int(is_admin), email))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False  # Username already exists
 
 def login_user(username, password):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=? AND password=?", (username, password))
-    return c.fetchone()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM users WHERE username=? AND password=?", (username, password))
+        return c.fetchone()
 
 def get_user_info(username):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=?", (username,))
-    return c.fetchone()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM users WHERE username=?", (username,))
+        return c.fetchone()
+
+# Pagination helpers
+def _where(conditions):
+    """Join SQL conditions into a WHERE clause"""
+    return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+def _split_page(rows, limit, cursor_key):
+    """Drop the look-ahead row and return (rows, cursor for the next page or None)"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, cursor_key(rows[-1])
+    return rows, None
+
+# Cursor for the first application still being scored (NULL scores sort after every scored row)
+UNSCORED_CURSOR = (None, None)
+
+def _score_cursor_condition(cursor):
+    """Keyset condition and params for pages ordered by match_score DESC, id DESC"""
+    score, application_id = cursor
+    if score is not None:
+        return "(a.match_score, a.id) < (?, ?)", [score, application_id]
+    if application_id is None:
+        return "a.match_score IS NULL", []
+    return "a.match_score IS NULL AND a.id < ?", [application_id]
+
+def _fetch_score_page(build_query, cursor, limit):
+    """Fetch a score-ordered page, moving on to unscored applications once the scored ones run out.
+
+    Keeping the two ranges in separate queries lets each one seek straight to its cursor.
+    """
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(*build_query(cursor))
+        rows = c.fetchall()
+        if cursor and cursor[0] is not None and len(rows) <= limit:
+            c.execute(*build_query(UNSCORED_CURSOR))
+            rows += c.fetchall()
+    return rows
+
+# Skill functions
+def _skill_ids(conn, names):
+    """Row ids for canonical skill names, adding any the skills table has not seen yet"""
+    names = sorted(names)
+    if not names:
+        return []
+    conn.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)", [(name,) for name in names])
+    rows = conn.execute("SELECT id FROM skills WHERE name IN (SELECT value FROM json_each(?))",
+                        (json.dumps(names),)).fetchall()
+    return [row[0] for row in rows]
+
+def link_application_skills(conn, application_id, skills_text, resume):
+    """Record the canonical skills found in an application's extracted skills and resume"""
+    skill_ids = _skill_ids(conn, extract_skills(f"{skills_text or ''}\n{resume or ''}"))
+    conn.executemany("INSERT OR IGNORE INTO application_skills (application_id, skill_id) VALUES (?, ?)",
+                     [(application_id, skill_id) for skill_id in skill_ids])
+
+def link_job_skills(conn, job_id, title, description, requirements):
+    """Record the canonical skills a job asks for"""
+    skill_ids = _skill_ids(conn, extract_skills(f"{title or ''}\n{description or ''}\n{requirements or ''}"))
+    conn.executemany("INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)",
+                     [(job_id, skill_id) for skill_id in skill_ids])
+
+def get_job_skills(job_id):
+    """Set of canonical skills a job asks for"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT s.name FROM job_skills js
+                    JOIN skills s ON s.id = js.skill_id
+                    WHERE js.job_id = ?""", (job_id,))
+        return {row[0] for row in c.fetchall()}
+
+def get_application_skills(application_ids):
+    """Canonical skill sets for several applications at once, keyed by application id"""
+    skills_by_application = {application_id: set() for application_id in application_ids}
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT aps.application_id, s.name FROM application_skills aps
+                    JOIN skills s ON s.id = aps.skill_id
+                    WHERE aps.application_id IN (SELECT value FROM json_each(?))""",
+                  (json.dumps(list(skills_by_application)),))
+        for application_id, name in c.fetchall():
+            skills_by_application[application_id].add(name)
+    return skills_by_application
+
+def get_top_skills_by_employer(username, limit=5):
+    """Skills asked for by the most of an employer's jobs, as (skill, job count)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT s.name, COUNT(*) AS job_count
+                    FROM jobs j
+                    JOIN job_skills js ON js.job_id = j.id
+                    JOIN skills s ON s.id = js.skill_id
+                    WHERE j.posted_by = ?
+                    GROUP BY js.skill_id
+                    ORDER BY job_count DESC, s.name
+                    LIMIT ?""", (username, limit))
+        return c.fetchall()
+
+def get_skill_gaps_by_job(job_id):
+    """For each skill a job asks for: (skill, applicants who have it, applicants who don't)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT s.name, COUNT(aps.application_id), COALESCE(st.application_count, 0)
+                    FROM job_skills js
+                    JOIN skills s ON s.id = js.skill_id
+                    LEFT JOIN job_stats st ON st.job_id = js.job_id
+                    LEFT JOIN applications a ON a.job_id = js.job_id
+                    LEFT JOIN application_skills aps
+                           ON aps.application_id = a.id AND aps.skill_id = js.skill_id
+                    WHERE js.job_id = ?
+                    GROUP BY js.skill_id
+                    ORDER BY s.name""", (job_id,))
+        return [(name, have, total - have) for name, have, total in c.fetchall()]
 
 # Job management functions
-def get_jobs():
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""SELECT id, title, description, posted_by, requirements, 
-                salary_range, location, job_type, created_at FROM jobs 
-                ORDER BY created_at DESC""")
-    return c.fetchall()
+# One amount: an optional currency sign, the number and an optional multiplier (k/m, or
+# lakh/LPA/crore for Indian salaries). Two amounts joined by a dash or "to" are a range.
+_SALARY_AMOUNT = r"([$£€₹]?)\s*(\d+(?:\.\d+)?)\s*(lakhs?|lacs?|lpa|crores?|cr|k|m|)(?![a-z])"
+SALARY_PATTERN = re.compile(_SALARY_AMOUNT + r"(?:\s*(?:-|–|—|to)\s*" + _SALARY_AMOUNT + r")?")
+# Benefit names that look like amounts ("401k", "403(b)")
+RETIREMENT_PLAN_PATTERN = re.compile(r"\b40[13]\s*\(?[kb]\)?")
+HOURLY_PATTERN = re.compile(r"/\s*(?:hr|hour)\b|\bper\s+hour\b|\ban\s+hour\b|\bhourly\b")
+SALARY_MULTIPLIERS = {
+    "k": 1000, "m": 1000000,
+    "lakh": 100000, "lakhs": 100000, "lac": 100000, "lacs": 100000, "lpa": 100000,
+    "crore": 10000000, "crores": 10000000, "cr": 10000000,
+}
+# Hourly rates are annualized so they sort alongside yearly salaries
+HOURS_PER_YEAR = 2080
+
+def parse_salary_range(salary_range):
+    """Parse free-text salary like "$60K-80K", "$60,000 - $80,000", "$25/hr" or "₹12 lakh" into
+    yearly (min, max).
+
+    Only amounts next to a currency sign or a multiplier count, so "Competitive, 401k" or
+    "3+ years" give (None, None).
+    """
+    text = RETIREMENT_PLAN_PATTERN.sub(" ", (salary_range or "").lower().replace(",", ""))
+    for match in SALARY_PATTERN.finditer(text):
+        currency, number, suffix, end_currency, end_number, end_suffix = match.groups()
+        if not (currency or suffix or end_currency or end_suffix):
+            continue
+
+        # "60-80K" means both ends are in thousands
+        amounts = [(number, suffix)] + ([(end_number, end_suffix)] if end_number else [])
+        suffixes = [suffix for _, suffix in amounts if suffix]
+        values = []
+        for amount, amount_suffix in amounts:
+            amount_suffix = amount_suffix or (suffixes[-1] if suffixes and float(amount) < 1000 else "")
+            values.append(float(amount) * SALARY_MULTIPLIERS.get(amount_suffix, 1))
+        if HOURLY_PATTERN.search(text):
+            values = [value * HOURS_PER_YEAR for value in values]
+        return (min(values), max(values))
+    return (None, None)
+
+# Browse sort orders: (sort key expression, direction). The salary expressions match the
+# expression indexes from migration 6 so missing salaries sort last. Relevance weighs
+# title matches most, then requirements, then description.
+JOB_SORTS = {
+    "newest": ("j.created_at", "DESC"),
+    "salary_high": ("COALESCE(j.salary_max, -1)", "DESC"),
+    "salary_low": ("COALESCE(j.salary_min, 1e18)", "ASC"),
+    "relevance": ("bm25(jobs_fts, 10.0, 1.0, 4.0)", "ASC"),
+}
+
+def _browse_jobs_query(limit, cursor=None, query=None, location=None, job_type=None, sort="newest"):
+    fts_query = _fts_query(query) if query else ""
+    if sort == "relevance" and not fts_query:
+        sort = "newest"
+    sort_key, direction = JOB_SORTS[sort]
+
+    conditions = []
+    params = []
+    if fts_query:
+        source = "jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid"
+        snippet = "snippet(jobs_fts, -1, '**', '**', '…', 16)"
+        conditions.append("jobs_fts MATCH ?")
+        params.append(fts_query)
+    else:
+        source = "jobs j"
+        snippet = "NULL"
+    if location:
+        conditions.append("j.location = ?")
+        params.append(location)
+    if job_type:
+        conditions.append("j.job_type = ?")
+        params.append(job_type)
+    if cursor:
+        # A range on the sort key plus a tie-break, so SQLite can seek straight into the index
+        op = "<" if direction == "DESC" else ">"
+        conditions.append(f"{sort_key} {op}= ? AND ({sort_key} {op} ? OR j.id {op} ?)")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+
+    sql = f"""SELECT j.id, j.title, j.description, j.posted_by, j.requirements,
+              j.salary_range, j.location, j.job_type, j.created_at, {snippet}, {sort_key}
+              FROM {source}
+              {_where(conditions)}
+              ORDER BY {sort_key} {direction}, j.id {direction}
+              LIMIT ?"""
+    # Fetch one extra row to find out whether there is a next page
+    return sql, params + [limit + 1]
+
+def browse_jobs(query=None, location=None, job_type=None, sort="newest", limit=20, cursor=None):
+    """Filtered, sorted page of jobs. Rows end with a search snippet (or None) and the sort key.
+
+    sort is one of JOB_SORTS; cursor is the (sort key, id) of the last job seen.
+    """
+    sql, params = _browse_jobs_query(limit, cursor, query, location, job_type, sort)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = c.fetchall()
+    return _split_page(rows, limit, lambda job: (job[10], job[0]))
+
+def get_jobs_page(limit=20, cursor=None, location=None, job_type=None):
+    """Newest jobs first, one page at a time. cursor is the (created_at, id) of the last job seen"""
+    return browse_jobs(location=location, job_type=job_type, limit=limit, cursor=cursor)
+
+# Filter dropdown values, cached until a job is posted (or the TTL runs out for other processes)
+FACET_CACHE_TTL = 300
+_facet_cache = {}
+
+def get_job_facets():
+    """Distinct locations and job types for the browse filters"""
+    cached = _facet_cache.get("facets")
+    if cached and time.monotonic() - cached[0] < FACET_CACHE_TTL:
+        metrics.increment("db.facet_cache.hits")
+        return cached[1]
+    metrics.increment("db.facet_cache.misses")
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT DISTINCT location FROM jobs WHERE location != ''")
+        locations = [row[0] for row in c.fetchall()]
+        c.execute("SELECT DISTINCT job_type FROM jobs WHERE job_type != ''")
+        job_types = [row[0] for row in c.fetchall()]
+
+    facets = {"locations": locations, "job_types": job_types}
+    _facet_cache["facets"] = (time.monotonic(), facets)
+    return facets
+
+def invalidate_job_facets():
+    _facet_cache.clear()
 
 def get_job_by_id(job_id):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""SELECT id, title, description, posted_by, requirements, 
-                salary_range, location, job_type, created_at FROM jobs 
-                WHERE id=?""", (job_id,))
-    return c.fetchone()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, title, description, posted_by, requirements,
+                    salary_range, location, job_type, created_at FROM jobs
+                    WHERE id=?""", (job_id,))
+        return c.fetchone()
+
+def get_jobs_by_employer(username):
+    """An employer's jobs, newest first, each with (application count, average score) appended"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT j.id, j.title, j.description, j.posted_by, j.requirements,
+                    j.salary_range, j.location, j.job_type, j.created_at,
+                    COALESCE(s.application_count, 0), s.score_sum, s.scored_count
+                    FROM jobs j
+                    LEFT JOIN job_stats s ON s.job_id = j.id
+                    WHERE j.posted_by = ?
+                    ORDER BY j.created_at DESC, j.id DESC""", (username,))
+        rows = c.fetchall()
+    return [row[:10] + (row[10] / row[11] if row[11] else 0,) for row in rows]
+
+def get_job_stats(job_id):
+    """Materialized application statistics for a job"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT application_count, scored_count, score_sum, min_score, max_score,
+                    pending_count, interview_count, accepted_count, rejected_count, last_application_at
+                    FROM job_stats WHERE job_id = ?""", (job_id,))
+        row = c.fetchone() or (0, 0, 0, None, None, 0, 0, 0, 0, None)
+
+    return {
+        "application_count": row[0],
+        "avg_score": row[2] / row[1] if row[1] else 0,
+        "min_score": row[3],
+        "max_score": row[4],
+        "status_counts": {
+            "Pending": row[5],
+            "Interview": row[6],
+            "Accepted": row[7],
+            "Rejected": row[8]
+        },
+        "last_application_at": row[9]
+    }
 
 def post_job(title, desc, posted_by, requirements, salary_range="", location="", job_type=""):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""INSERT INTO jobs 
-                (title, description, posted_by, requirements, salary_range, location, job_type) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)""",
-              (title, desc, posted_by, requirements, salary_range, location, job_type))
-    conn.commit()
-    return c.lastrowid
-
-def search_jobs(query):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    search_query = f"%{query}%"
-    c.execute("""SELECT id, title, description, posted_by, requirements, 
-                salary_range, location, job_type, created_at FROM jobs 
-                WHERE title LIKE ? OR description LIKE ? OR requirements LIKE ?
-                ORDER BY created_at DESC""", 
-              (search_query, search_query, search_query))
-    return c.fetchall()
+    salary_min, salary_max = parse_salary_range(salary_range)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""INSERT INTO jobs
+                    (title, description, posted_by, requirements, salary_range, location, job_type,
+                     salary_min, salary_max)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                  (title, desc, posted_by, requirements, salary_range, location, job_type,
+                   salary_min, salary_max))
+        job_id = c.lastrowid
+        link_job_skills(conn, job_id, title, desc, requirements)
+        conn.commit()
+
+    vector_index.index_job(job_id, title, desc, requirements)
+    invalidate_job_facets()
+    invalidate_recommendations()
+    return job_id
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query that prefix-matches every word"""
+    terms = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_jobs(query, limit=100):
+    """Full-text search over jobs, best matches first, with a highlighted snippet"""
+    if not _fts_query(query):
+        return []
+    jobs, _ = browse_jobs(query=query, sort="relevance", limit=limit)
+    return jobs
 
 # Application management functions
-def apply_to_job(username, job_id, resume, skills, experience, match_score, match_feedback):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""INSERT INTO applications 
-                (username, job_id, resume, extracted_skills, extracted_exp, match_score, match_feedback) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)""",
-              (username, job_id, resume, skills, experience, match_score, match_feedback))
-    conn.commit()
-    return c.lastrowid
-
-def get_applications_by_job(job_id):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""
-        SELECT a.id, a.username, j.title, a.extracted_skills, a.extracted_exp, a.match_score, 
-               a.match_feedback, a.application_date, a.status
+def apply_to_job(username, job_id, resume, skills=None, experience=None, match_score=None, match_feedback=None):
+    """Store an application. Without a match_score it is saved as queued for background scoring"""
+    scoring_status = "done" if match_score is not None else "queued"
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""INSERT INTO applications
+                    (username, job_id, resume, extracted_skills, extracted_exp, match_score, match_feedback,
+                     scoring_status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                  (username, job_id, resume, skills, experience, match_score, match_feedback, scoring_status))
+        application_id = c.lastrowid
+        link_application_skills(conn, application_id, skills, resume)
+        conn.commit()
+
+    vector_index.index_resume(application_id, resume)
+    invalidate_recommendations(username)
+    return application_id
+
+def save_scored_applications(applications):
+    """Store many already-scored applications in one transaction.
+
+    applications is a list of (username, job_id, resume, skills, experience, match_score, match_feedback).
+    A candidate's existing application to the same job is updated with the new resume and score
+    (keeping its status and date) rather than duplicated, so re-running a batch is safe.
+    Returns the application ids in the same order.
+    """
+    application_ids = []
+    with get_connection() as conn:
+        c = conn.cursor()
+        for username, job_id, resume, skills, experience, match_score, match_feedback in applications:
+            c.execute("""SELECT id FROM applications WHERE username = ? AND job_id = ?
+                        ORDER BY id DESC LIMIT 1""", (username, job_id))
+            existing = c.fetchone()
+            if existing:
+                application_id = existing[0]
+                c.execute("""UPDATE applications
+                            SET resume = ?, extracted_skills = ?, extracted_exp = ?, match_score = ?,
+                                match_feedback = ?, scoring_status = 'done'
+                            WHERE id = ?""",
+                          (resume, skills, experience, match_score, match_feedback, application_id))
+                c.execute("DELETE FROM application_skills WHERE application_id = ?", (application_id,))
+            else:
+                c.execute("""INSERT INTO applications
+                            (username, job_id, resume, extracted_skills, extracted_exp, match_score, match_feedback)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                          (username, job_id, resume, skills, experience, match_score, match_feedback))
+                application_id = c.lastrowid
+            application_ids.append(application_id)
+            link_application_skills(conn, application_id, skills, resume)
+        conn.commit()
+
+    vector_index.get_index("resumes").add_many(
+        (application_id, application[2]) for application_id, application in zip(application_ids, applications)
+    )
+    for username in {application[0] for application in applications}:
+        invalidate_recommendations(username)
+    return application_ids
+
+def get_top_candidates_for_job(job_id, limit=50):
+    """Best-matching candidates from every stored resume, by vector similarity (no model calls).
+
+    Returns (application id, username, applied-for job title, skills, similarity) with one row per
+    candidate, skipping people who already applied to this job.
+    """
+    job = get_job_by_id(job_id)
+    if not job:
+        return []
+
+    # Over-fetch because one candidate may have several stored resumes
+    matches = vector_index.search_resumes(vector_index.job_text(job[1], job[2], job[4]), k=limit * 4)
+    if not matches:
+        return []
+
+    similarity = dict(matches)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT a.id, a.username, j.title, a.extracted_skills, a.job_id
+                    FROM applications a
+                    JOIN jobs j ON a.job_id = j.id
+                    WHERE a.id IN (SELECT value FROM json_each(?))""",
+                  (json.dumps(list(similarity)),))
+        rows = c.fetchall()
+
+    applied = {row[1] for row in rows if row[4] == job_id}
+    candidates = {}
+    for app_id, username, title, skills, applied_job in sorted(rows, key=lambda r: -similarity[r[0]]):
+        if username not in applied and username not in candidates:
+            candidates[username] = (app_id, username, title, skills, similarity[app_id])
+    return list(candidates.values())[:limit]
+
+def _applications_by_job_query(job_id, limit, cursor=None, status=None):
+    conditions = ["a.job_id = ?"]
+    params = [job_id]
+    if status:
+        conditions.append("a.status = ?")
+        params.append(status)
+    if cursor:
+        condition, cursor_params = _score_cursor_condition(cursor)
+        conditions.append(condition)
+        params.extend(cursor_params)
+
+    sql = f"""
+        SELECT a.id, a.username, j.title, a.extracted_skills, a.extracted_exp, a.match_score,
+               a.match_feedback, a.application_date, a.status, a.scoring_status
         FROM applications a
         JOIN jobs j ON a.job_id = j.id
-        WHERE a.job_id = ?
-        ORDER BY a.match_score DESC
-    """, (job_id,))
-    return c.fetchall()
-
-def get_applications_by_employer(username):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""
-        SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score, 
-               a.match_feedback, a.application_date, a.status
+        {_where(conditions)}
+        ORDER BY a.match_score DESC, a.id DESC
+        LIMIT ?
+    """
+    return sql, params + [limit + 1]
+
+def get_applications_by_job_page(job_id, limit=20, cursor=None, status=None):
+    """Best matches for a job first. cursor is the (match_score, id) of the last application seen"""
+    rows = _fetch_score_page(lambda page_cursor: _applications_by_job_query(job_id, limit, page_cursor, status),
+                             cursor, limit)
+    return _split_page(rows, limit, lambda app: (app[5], app[0]))
+
+def get_application_status_counts_by_job(job_id):
+    """Number of applications to a job in each status, read from job_stats"""
+    stats = get_job_stats(job_id)
+    return {status: count for status, count in stats["status_counts"].items() if count}
+
+def _applications_by_employer_query(username, limit, cursor=None, job_id=None, status=None):
+    conditions = ["j.posted_by = ?"]
+    params = [username]
+    if job_id is not None:
+        conditions.append("a.job_id = ?")
+        params.append(job_id)
+    if status:
+        conditions.append("a.status = ?")
+        params.append(status)
+    if cursor:
+        condition, cursor_params = _score_cursor_condition(cursor)
+        conditions.append(condition)
+        params.extend(cursor_params)
+
+    sql = f"""
+        SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score,
+               a.match_feedback, a.application_date, a.status, a.scoring_status
         FROM applications a
         JOIN jobs j ON a.job_id = j.id
-        WHERE j.posted_by = ?
-        ORDER BY a.match_score DESC
-    """, (username,))
-    return c.fetchall()
-
-def get_applications_by_user(username):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""
-        SELECT a.id, j.title, j.posted_by, a.match_score, a.match_feedback, a.application_date, a.status, j.id
+        {_where(conditions)}
+        ORDER BY a.match_score DESC, a.id DESC
+        LIMIT ?
+    """
+    return sql, params + [limit + 1]
+
+def get_applications_by_employer_page(username, limit=20, cursor=None, job_id=None, status=None):
+    """Best matches across an employer's jobs first. cursor is the (match_score, id) of the last application seen"""
+    rows = _fetch_score_page(
+        lambda page_cursor: _applications_by_employer_query(username, limit, page_cursor, job_id, status),
+        cursor, limit
+    )
+    return _split_page(rows, limit, lambda app: (app[6], app[0]))
+
+def _applications_by_user_query(username, limit, cursor=None, status=None):
+    conditions = ["a.username = ?"]
+    params = [username]
+    if status:
+        conditions.append("a.status = ?")
+        params.append(status)
+    if cursor:
+        conditions.append("(a.application_date, a.id) < (?, ?)")
+        params.extend(cursor)
+
+    sql = f"""
+        SELECT a.id, j.title, j.posted_by, a.match_score, a.match_feedback, a.application_date, a.status, j.id,
+               a.scoring_status
         FROM applications a
         JOIN jobs j ON a.job_id = j.id
-        WHERE a.username = ?
-        ORDER BY a.application_date DESC
-    """, (username,))
-    return c.fetchall()
+        {_where(conditions)}
+        ORDER BY a.application_date DESC, a.id DESC
+        LIMIT ?
+    """
+    return sql, params + [limit + 1]
+
+def get_applications_by_user_page(username, limit=20, cursor=None, status=None):
+    """A candidate's most recent applications first. cursor is the (application_date, id) of the last application seen"""
+    sql, params = _applications_by_user_query(username, limit, cursor, status)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = c.fetchall()
+    return _split_page(rows, limit, lambda app: (app[5], app[0]))
+
+def get_application_status_counts_by_user(username):
+    """Number of a candidate's applications in each status"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT status, COUNT(*) FROM applications
+                    WHERE username = ? GROUP BY status""", (username,))
+        return dict(c.fetchall())
+
+# Background scoring functions
+def get_application_for_scoring(application_id):
+    """Mark a queued application as being scored and return (resume, job description, requirements)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("UPDATE applications SET scoring_status = 'scoring' WHERE id = ?", (application_id,))
+        c.execute("""SELECT a.resume, j.description, j.requirements
+                    FROM applications a
+                    JOIN jobs j ON a.job_id = j.id
+                    WHERE a.id = ?""", (application_id,))
+        row = c.fetchone()
+        conn.commit()
+        return row
+
+def save_application_score(application_id, skills, experience, match_score, match_feedback):
+    """Store the analysis for a background-scored application"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE applications
+                    SET extracted_skills = ?, extracted_exp = ?, match_score = ?, match_feedback = ?,
+                        scoring_status = 'done'
+                    WHERE id = ?""",
+                  (skills, experience, match_score, match_feedback, application_id))
+        link_application_skills(conn, application_id, skills, None)
+        conn.commit()
+
+def mark_scoring_failed(application_id, error):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE applications SET scoring_status = 'failed', match_feedback = ?
+                    WHERE id = ?""", (f"Automatic scoring failed: {error}", application_id))
+        conn.commit()
+
+def retry_scoring(application_id):
+    """Queue a failed application for another analysis. Returns False if it had not failed"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE applications SET scoring_status = 'queued', match_feedback = NULL
+                    WHERE id = ? AND scoring_status = 'failed'""", (application_id,))
+        conn.commit()
+        return c.rowcount > 0
+
+def get_unscored_application_ids():
+    """Applications left queued or mid-scoring, e.g. by a server restart"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id FROM applications
+                    WHERE scoring_status IN ('queued', 'scoring')
+                    ORDER BY id""")
+        return [row[0] for row in c.fetchall()]
+
+def get_scoring_pending(application_ids):
+    """The subset of the given applications that are still waiting for a score"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id FROM applications
+                    WHERE id IN (SELECT value FROM json_each(?))
+                      AND scoring_status IN ('queued', 'scoring')""",
+                  (json.dumps(list(application_ids)),))
+        return {row[0] for row in c.fetchall()}
 
 def update_job_status(application_id, new_status):
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("UPDATE applications SET status = ? WHERE id = ?", (new_status, application_id))
-    conn.commit()
\ No newline at end of file
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("UPDATE applications SET status = ? WHERE id = ?", (new_status, application_id))
+        conn.commit()
+
+# Bulk analysis run functions
+BULK_RESULT_COLUMNS = ("filename", "skills", "experience", "match_score", "match_feedback", "resume_text")
+
+def create_bulk_run(employer, job_id, mode, workers, resumes):
+    """Store a bulk run and its files up front. resumes is a list of (filename, text, read error)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""INSERT INTO bulk_runs (employer, job_id, mode, workers, total_count)
+                    VALUES (?, ?, ?, ?, ?)""", (employer, job_id, mode, workers, len(resumes)))
+        run_id = c.lastrowid
+        c.executemany("""INSERT INTO bulk_run_items (run_id, position, filename, resume_text, status, error)
+                        VALUES (?, ?, ?, ?, ?, ?)""",
+                      [(run_id, position, filename, text, "failed" if error else "pending", error)
+                       for position, (filename, text, error) in enumerate(resumes)])
+        failed = sum(1 for _, _, error in resumes if error)
+        c.execute("UPDATE bulk_runs SET failed_count = ? WHERE id = ?", (failed, run_id))
+        conn.commit()
+        return run_id
+
+def get_bulk_run(run_id):
+    """(id, employer, job id, job title, mode, workers, status, total, done, failed, created, finished, error)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT r.id, r.employer, r.job_id, j.title, r.mode, r.workers, r.status,
+                           r.total_count, r.done_count, r.failed_count, r.created_at, r.finished_at, r.error
+                    FROM bulk_runs r
+                    JOIN jobs j ON r.job_id = j.id
+                    WHERE r.id = ?""", (run_id,))
+        return c.fetchone()
+
+def get_bulk_runs_by_employer(username, limit=20):
+    """An employer's most recent bulk runs, in the get_bulk_run() row layout"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT r.id, r.employer, r.job_id, j.title, r.mode, r.workers, r.status,
+                           r.total_count, r.done_count, r.failed_count, r.created_at, r.finished_at, r.error
+                    FROM bulk_runs r
+                    JOIN jobs j ON r.job_id = j.id
+                    WHERE r.employer = ?
+                    ORDER BY r.created_at DESC, r.id DESC
+                    LIMIT ?""", (username, limit))
+        return c.fetchall()
+
+def get_unfinished_bulk_run_ids():
+    """Runs that still have files to analyze, e.g. after a server restart"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id FROM bulk_runs WHERE status = 'running' ORDER BY id")
+        return [row[0] for row in c.fetchall()]
+
+def get_pending_bulk_items(run_id):
+    """(item id, filename, resume text) for every file in a run not analyzed yet, in upload order"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, filename, resume_text FROM bulk_run_items
+                    WHERE run_id = ? AND status = 'pending'
+                    ORDER BY position""", (run_id,))
+        return c.fetchall()
+
+def save_bulk_item_result(run_id, item_id, result):
+    """Store one file's analysis (or error) and count it against its run"""
+    failed = "error" in result
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE bulk_run_items
+                    SET status = ?, skills = ?, experience = ?, match_score = ?, match_feedback = ?,
+                        error = ?, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = ?""",
+                  ("failed" if failed else "done", result.get("skills"), result.get("experience"),
+                   result.get("match_score"), result.get("match_feedback"), result.get("error"), item_id))
+        c.execute("""UPDATE bulk_runs
+                    SET done_count = done_count + ?, failed_count = failed_count + ?
+                    WHERE id = ?""", (0 if failed else 1, 1 if failed else 0, run_id))
+        conn.commit()
+
+def finish_bulk_run(run_id):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE bulk_runs SET status = 'completed', finished_at = CURRENT_TIMESTAMP
+                    WHERE id = ?""", (run_id,))
+        conn.commit()
+
+def fail_bulk_run(run_id, error):
+    """Record that a run's worker crashed; its pending files stay pending for a resume"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE bulk_runs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = ?""", (str(error), run_id))
+        conn.commit()
+
+def reopen_bulk_run(run_id):
+    """Put a failed run back to running before its pending files are analyzed again"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""UPDATE bulk_runs SET status = 'running', error = NULL, finished_at = NULL
+                    WHERE id = ? AND status = 'failed'""", (run_id,))
+        conn.commit()
+
+def get_bulk_run_results(run_id, limit=None):
+    """Analyzed files of a run, best match first, as result dicts like the engine's bulk results"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT filename, skills, experience, match_score, match_feedback, resume_text
+                    FROM bulk_run_items
+                    WHERE run_id = ? AND status = 'done'
+                    ORDER BY match_score DESC, position
+                    LIMIT ?""", (run_id, -1 if limit is None else limit))
+        return [dict(zip(BULK_RESULT_COLUMNS, row)) for row in c.fetchall()]
+
+def get_bulk_run_failures(run_id):
+    """(filename, error) for every file in a run that could not be analyzed"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT filename, error FROM bulk_run_items
+                    WHERE run_id = ? AND status = 'failed'
+                    ORDER BY position""", (run_id,))
+        return c.fetchall()
+
+# Dashboard functions
+def get_employer_dashboard_metrics(username):
+    """Headline metrics and per-job application counts for an employer, in one query over job_stats"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT j.id, j.title, j.created_at, COALESCE(s.application_count, 0),
+                   s.score_sum, COALESCE(s.scored_count, 0)
+            FROM jobs j
+            LEFT JOIN job_stats s ON s.job_id = j.id
+            WHERE j.posted_by = ?
+            ORDER BY j.created_at DESC, j.id DESC
+        """, (username,))
+        rows = c.fetchall()
+
+    score_sum = sum(row[4] or 0 for row in rows)
+    scored_count = sum(row[5] for row in rows)
+    return {
+        "job_count": len(rows),
+        "application_count": sum(row[3] for row in rows),
+        "avg_score": score_sum / scored_count if scored_count else 0,
+        # (job id, title, posted date, application count), newest job first
+        "jobs": [(row[0], row[1], row[2], row[3]) for row in rows]
+    }
+
+def get_candidate_dashboard_metrics(username):
+    """Headline metrics for a candidate, in one query"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT job_id), AVG(match_score), MAX(match_score)
+            FROM applications
+            WHERE username = ?
+        """, (username,))
+        application_count, unique_jobs, avg_score, max_score = c.fetchone()
+
+    return {
+        "application_count": application_count,
+        "unique_jobs": unique_jobs,
+        "avg_score": avg_score or 0,
+        "max_score": max_score or 0
+    }
+
+# Job recommendations, cached per user until a job is posted or the user applies somewhere
+RECOMMENDATION_CACHE_TTL = 600
+RECOMMENDATION_PROFILE_SIZE = 5
+_recommendation_cache = {}
+
+def get_recommended_jobs(username, limit=3):
+    """Jobs from the whole board most similar to the user's recent resumes and applications.
+
+    Jobs the user already applied to are left out. Users with no application history get the
+    newest jobs instead.
+    """
+    cached = _recommendation_cache.get(username)
+    if cached and time.monotonic() - cached[0] < RECOMMENDATION_CACHE_TTL and cached[1] >= limit:
+        metrics.increment("db.recommendation_cache.hits")
+        return cached[2][:limit]
+    metrics.increment("db.recommendation_cache.misses")
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT a.resume, j.title, j.requirements
+                    FROM applications a
+                    JOIN jobs j ON a.job_id = j.id
+                    WHERE a.username = ?
+                    ORDER BY a.application_date DESC, a.id DESC
+                    LIMIT ?""", (username, RECOMMENDATION_PROFILE_SIZE))
+        history = c.fetchall()
+        c.execute("SELECT DISTINCT job_id FROM applications WHERE username = ?", (username,))
+        applied = {row[0] for row in c.fetchall()}
+
+    if not history:
+        jobs, _ = browse_jobs(limit=limit)
+        jobs = [job[:9] for job in jobs]
+    else:
+        # Recent resumes plus the titles and requirements of jobs the user went for
+        profile = "\n".join(f"{resume}\n{title}\n{requirements or ''}" for resume, title, requirements in history)
+        matches = vector_index.search_jobs(profile, k=limit, exclude=applied)
+        order = {job_id: rank for rank, (job_id, _) in enumerate(matches)}
+
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT id, title, description, posted_by, requirements, salary_range, location, job_type, created_at
+                        FROM jobs
+                        WHERE id IN (SELECT value FROM json_each(?))""",
+                      (json.dumps(list(order)),))
+            jobs = sorted(c.fetchall(), key=lambda job: order[job[0]])
+
+    _recommendation_cache[username] = (time.monotonic(), limit, jobs)
+    return jobs
+
+def invalidate_recommendations(username=None):
+    """Drop cached recommendations for one user, or for everyone"""
+    if username is None:
+        _recommendation_cache.clear()
+    else:
+        _recommendation_cache.pop(username, None)
+
+# Pool occupancy and cache hit rates for the performance page
+metrics.register_gauge("db.pool.open", lambda: _pool_created)
+metrics.register_gauge("db.pool.idle", _pool.qsize)
+metrics.register_gauge("db.facet_cache.hit_rate", lambda: metrics.hit_rate("db.facet_cache"))
+metrics.register_gauge("db.recommendation_cache.hit_rate", lambda: metrics.hit_rate("db.recommendation_cache"))
+
+# Time every public query function; the connection helpers are plumbing, not queries
+metrics.instrument_module(sys.modules[__name__], "db", skip={"get_connection", "close_connections"})
@@ -0,0 +1,13 @@
+"""Resume analysis with TeapotAI, free of any UI code.
+
+Importing this package is cheap: the model is built by start_warmup() in the background, or else by
+the first query that misses the output cache. Long-running calls take an optional progress
+callback instead of drawing anything.
+"""
+from engine.model import (MODEL_ID, PROMPT_VERSION, TEAPOT, INT8, ONNX, BACKENDS, load_model, get_model, query,
+                          start_warmup, is_ready, wait_until_ready, warmup_error)
+from engine.analysis import (MULTI_CALL, SINGLE_PASS, extract_resume_info, match_resume_to_job,
+                             parse_single_pass_output, analyze_resume)
+from engine.batching import query_many
+from engine.bulk import (DEFAULT_BULK_WORKERS, read_resume_file, analyze_resume_file, analyze_resumes_batched,
+                         iter_bulk_resumes, analyze_bulk)
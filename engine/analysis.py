@@ -0,0 +1,178 @@
+import re
+import json
+from engine.model import query
+from engine.context import (RESUME_TOKEN_BUDGET, MATCH_RESUME_TOKEN_BUDGET, JOB_TOKEN_BUDGET, build_context,
+                            fit_to_budget, estimate_tokens)
+
+# Analysis modes: three separate model calls, or one call with a structured answer
+MULTI_CALL = "multi_call"
+SINGLE_PASS = "single_pass"
+
+# Prompt wording is part of the output cache key: bump PROMPT_VERSION in engine.model when editing these
+SKILLS_QUERY = """
+    Extract a comprehensive list of skills from this resume.
+    Include technical skills, soft skills, and domain expertise.
+    Format as a comma-separated list.
+    """
+
+EXPERIENCE_QUERY = """
+    Provide a concise professional summary from this resume.
+    Include key information about:
+    - Years of experience
+    - Industries worked in
+    - Major accomplishments
+    - Leadership roles (if any)
+    - Educational background
+    Limit to 3-4 sentences.
+    """
+
+MATCH_QUERY = """
+    Analyze how well this candidate's resume matches the job requirements.
+
+    Part 1: Provide a match score from 0-100 as a single number on the first line just the number.
+
+    Part 2: Provide a detailed analysis including:
+    - Key matching skills and qualifications
+    - Missing or mismatched requirements
+    - Overall suitability assessment
+    - Recommendations for the hiring manager
+
+    Format your response with the score on the first line, followed by your analysis.
+
+    """
+
+SINGLE_PASS_QUERY = """
+Analyze this candidate's resume against the job. Answer in exactly this format,
+with each label at the start of its own line:
+SKILLS: comma-separated list of the candidate's technical skills, soft skills and domain expertise
+EXPERIENCE: 3-4 sentence professional summary covering years of experience, industries, major accomplishments, leadership roles and education
+SCORE: match score from 0-100, just the number
+FEEDBACK: key matching qualifications, missing or mismatched requirements, overall suitability and a recommendation for the hiring manager
+"""
+
+# What each extraction prompt looks for when a long resume has to be cut down to its budget
+SKILLS_FOCUS = "skills technical tools technologies languages frameworks platforms certifications proficient expertise"
+SKILLS_HEADINGS = ("skill", "competenc", "expertise", "tool", "technolog", "certific")
+EXPERIENCE_FOCUS = "experience years senior lead led managed built delivered achieved degree university education"
+EXPERIENCE_HEADINGS = ("summary", "profile", "experience", "employment", "history", "education")
+MATCH_HEADINGS = ("summary", "profile", "experience", "skill")
+
+# "SKILLS:", "**Score** -", "experience =" ... at the start of a line
+SECTION_LABEL = re.compile(r"^[\s*#>-]*(skills|experience|score|feedback)[\s*]*[:=-]", re.IGNORECASE | re.MULTILINE)
+
+def _report(progress, message):
+    if progress:
+        progress(message)
+
+def skills_context(resume_text):
+    return build_context(resume_text, SKILLS_FOCUS, RESUME_TOKEN_BUDGET, SKILLS_HEADINGS)
+
+def experience_context(resume_text):
+    return build_context(resume_text, EXPERIENCE_FOCUS, RESUME_TOKEN_BUDGET, EXPERIENCE_HEADINGS)
+
+def match_context(resume_text, job_description, job_requirements):
+    """Resume and job within the model's input budget; the resume keeps the parts closest to the job"""
+    # The job gets its budget split evenly, or handed over when one part is short
+    description_budget = max(JOB_TOKEN_BUDGET // 2, JOB_TOKEN_BUDGET - estimate_tokens(job_requirements))
+    requirements_budget = max(JOB_TOKEN_BUDGET // 2, JOB_TOKEN_BUDGET - estimate_tokens(job_description))
+    job_description = fit_to_budget(job_description, description_budget)
+    job_requirements = fit_to_budget(job_requirements, requirements_budget)
+    resume_text = build_context(resume_text, f"{job_description} {job_requirements}", MATCH_RESUME_TOKEN_BUDGET,
+                                MATCH_HEADINGS)
+
+    combined_job_info = f"Job Description: {job_description}\n\nJob Requirements: {job_requirements}"
+    return f"Here is the Candidate's Resume:\n{resume_text}\n and Here is the \n{combined_job_info}"
+
+def extract_resume_info(resume_text, progress=None):
+    """Extract skills and an experience summary from a resume"""
+    _report(progress, "Extracting skills...")
+    skills = query(SKILLS_QUERY, skills_context(resume_text))
+
+    _report(progress, "Summarizing experience...")
+    experience = query(EXPERIENCE_QUERY, experience_context(resume_text))
+
+    return {
+        "skills": skills,
+        "experience": experience
+    }
+
+def match_resume_to_job(resume_text, job_description, job_requirements, progress=None):
+    """Score a resume against a job, with the model's analysis as feedback"""
+    _report(progress, "Calculating job match score...")
+    match_analysis = query(MATCH_QUERY, match_context(resume_text, job_description, job_requirements))
+
+    return parse_match_output(match_analysis)
+
+def parse_match_output(match_analysis):
+    """Split a match answer into its score (first line) and feedback (the rest)"""
+    lines = match_analysis.strip().split('\n')
+    try:
+        match_score = float(lines[0].strip())
+        # Cap at 100
+        match_score = min(match_score, 100.0)
+    except ValueError:
+        # Default score if parsing fails
+        match_score = 50.0
+
+    # The feedback is everything after the first line
+    match_feedback = '\n'.join(lines[1:]) if len(lines) > 1 else match_analysis
+
+    return {
+        "score": match_score,
+        "feedback": match_feedback
+    }
+
+def parse_single_pass_output(output):
+    """Parse a single-pass answer into skills/experience/score/feedback, or None if it is unusable"""
+    sections = {}
+
+    # Accept a JSON object as well as the labelled format
+    json_match = re.search(r"\{.*\}", output, re.DOTALL)
+    if json_match:
+        try:
+            data = json.loads(json_match.group(0))
+            if isinstance(data, dict):
+                sections = {key.lower(): str(value) for key, value in data.items()}
+        except ValueError:
+            pass
+
+    if not sections:
+        labels = list(SECTION_LABEL.finditer(output))
+        for i, label in enumerate(labels):
+            end = labels[i + 1].start() if i + 1 < len(labels) else len(output)
+            sections.setdefault(label.group(1).lower(), output[label.end():end].strip())
+
+    score_match = re.search(r"\d+(?:\.\d+)?", sections.get("score", ""))
+    if not score_match or not sections.get("skills"):
+        return None
+
+    return {
+        "skills": sections["skills"],
+        "experience": sections.get("experience", ""),
+        "score": min(float(score_match.group(0)), 100.0),
+        "feedback": sections.get("feedback", "")
+    }
+
+def analyze_resume(resume_text, job_description, job_requirements, mode=MULTI_CALL, progress=None):
+    """Extract resume info and score it against a job, in one model call (SINGLE_PASS) or three.
+
+    progress, if given, is called with a short status message before each model call.
+    """
+    if mode == SINGLE_PASS:
+        _report(progress, "Analyzing resume...")
+        output = query(SINGLE_PASS_QUERY, match_context(resume_text, job_description, job_requirements))
+        parsed = parse_single_pass_output(output)
+        if parsed:
+            parsed["mode"] = SINGLE_PASS
+            return parsed
+
+    # Separate calls, also the fallback when the single-pass answer can't be parsed
+    extracted = extract_resume_info(resume_text, progress)
+    match_result = match_resume_to_job(resume_text, job_description, job_requirements, progress)
+    return {
+        "skills": extracted["skills"],
+        "experience": extracted["experience"],
+        "score": match_result["score"],
+        "feedback": match_result["feedback"],
+        "mode": MULTI_CALL
+    }
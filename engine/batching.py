@@ -0,0 +1,162 @@
+import threading
+import time
+import metrics
+import model_cache
+from engine.model import (MODEL_ID, PROMPT_VERSION, get_model, cache_model_id, _clear_stale_outputs,
+                          _inference_succeeded)
+
+# The pipeline frames prompts like TeapotAI.query but decodes with its own settings, so its
+# answers are cached apart
+PIPELINE_TASK = "text2text-generation"
+MAX_NEW_TOKENS = 512
+
+# Batch size bounds; the sizer moves between them by measured time per prompt
+MIN_BATCH_SIZE = 1
+INITIAL_BATCH_SIZE = 4
+MAX_BATCH_SIZE = 64
+
+# Rough activation memory per padded input token during generation, and the share of free RAM a batch may use
+BYTES_PER_TOKEN = 256 * 1024
+MEMORY_FRACTION = 0.5
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_pipeline():
+    """A text2text-generation pipeline over the TeapotAI weights, built on first use"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                from transformers import pipeline
+                model = get_model()
+                if hasattr(model, "model") and hasattr(model, "tokenizer"):
+                    # Share the weights TeapotAI already loaded instead of holding a second copy
+                    _pipeline = pipeline(PIPELINE_TASK, model=model.model, tokenizer=model.tokenizer)
+                else:
+                    _pipeline = pipeline(PIPELINE_TASK, MODEL_ID, trust_remote_code=True)
+    return _pipeline
+
+def available_memory():
+    """Bytes of RAM available to new allocations, or None where that can't be read"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+class BatchSizer:
+    """Picks the next batch size by hill-climbing on seconds per prompt, capped by free memory"""
+
+    def __init__(self, size=INITIAL_BATCH_SIZE):
+        self.size = size
+        self.best_size = size
+        self.best_per_item = None
+        self._lock = threading.Lock()
+
+    def next_size(self, longest_tokens):
+        with self._lock:
+            size = self.size
+        memory = available_memory()
+        if memory:
+            size = min(size, int(memory * MEMORY_FRACTION // (max(longest_tokens, 1) * BYTES_PER_TOKEN)))
+        return max(MIN_BATCH_SIZE, size)
+
+    def record(self, batch_size, seconds):
+        """Grow while bigger batches keep getting cheaper per prompt, fall back to the best size otherwise"""
+        per_item = seconds / batch_size
+        with self._lock:
+            if self.best_per_item is None or per_item < self.best_per_item * 0.95:
+                self.best_per_item = per_item
+                self.best_size = batch_size
+                self.size = min(batch_size * 2, MAX_BATCH_SIZE)
+            elif per_item > self.best_per_item * 1.1:
+                self.size = self.best_size
+
+    def shrink(self):
+        """Halve the batch size after running out of memory"""
+        with self._lock:
+            self.size = max(MIN_BATCH_SIZE, self.size // 2)
+            self.best_size = min(self.best_size, self.size)
+            return self.size
+
+# Shared so what one bulk job learns about this machine carries over to the next
+batch_sizer = BatchSizer()
+metrics.register_gauge("model.batch_size", lambda: batch_sizer.size)
+
+def _prompt(query, context):
+    # The same framing TeapotAI.query gives the model, so batched answers match single calls
+    from teapotai.teapotai import DEFAULT_SYSTEM_PROMPT
+    return f"{context}\n{DEFAULT_SYSTEM_PROMPT}\n{query}"
+
+def _is_out_of_memory(error):
+    """Whether a generation error means the batch did not fit, as opposed to a model or input bug"""
+    if isinstance(error, MemoryError):
+        return True
+    try:
+        import torch
+        if isinstance(error, torch.cuda.OutOfMemoryError):
+            return True
+    except (ImportError, AttributeError):
+        pass
+    # Older torch and the CPU allocator raise plain RuntimeErrors
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and ("out of memory" in message or "can't allocate memory" in message)
+
+def _generate(pipe, prompts):
+    outputs = pipe(prompts, batch_size=len(prompts), max_new_tokens=MAX_NEW_TOKENS, truncation=True)
+    return [output[0]["generated_text"] if isinstance(output, list) else output["generated_text"] for output in outputs]
+
+def query_many(pairs, progress=None):
+    """Answer many (query, context) pairs, running the uncached ones through the model in batches.
+
+    Prompts are deduplicated and sorted by token length so each batch pads to a similar length.
+    progress, if given, is called as progress(answered, total) after each batch.
+    """
+    _clear_stale_outputs()
+    model_id = f"{cache_model_id()}:{PIPELINE_TASK}"
+    keys = [model_cache.make_key(model_id, PROMPT_VERSION, query, context) for query, context in pairs]
+    outputs = [model_cache.get(key) for key in keys]
+
+    # One generation per distinct uncached prompt
+    pending = {}
+    for i, output in enumerate(outputs):
+        if output is None:
+            pending.setdefault(keys[i], []).append(i)
+    if not pending:
+        return outputs
+
+    pipe = get_pipeline()
+    prompts = {key: _prompt(*pairs[indexes[0]]) for key, indexes in pending.items()}
+    lengths = {key: len(pipe.tokenizer(prompt)["input_ids"]) for key, prompt in prompts.items()}
+    order = sorted(pending, key=lengths.get)
+
+    answered = 0
+    while order:
+        size = batch_sizer.next_size(lengths[order[min(len(order), batch_sizer.size) - 1]])
+        batch = order[:size]
+        started = time.perf_counter()
+        try:
+            with metrics.timed("model.batch"):
+                generated = _generate(pipe, [prompts[key] for key in batch])
+        except Exception as e:
+            if size == MIN_BATCH_SIZE or not _is_out_of_memory(e):
+                raise
+            batch_sizer.shrink()
+            continue
+        _inference_succeeded()
+        batch_sizer.record(len(batch), time.perf_counter() - started)
+        metrics.increment("model.batch_prompts", len(batch))
+
+        for key, output in zip(batch, generated):
+            model_cache.put(key, output, PROMPT_VERSION)
+            for i in pending[key]:
+                outputs[i] = output
+        order = order[size:]
+        answered += len(batch)
+        if progress:
+            progress(answered, len(pending))
+    return outputs
@@ -0,0 +1,155 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from engine.analysis import (MULTI_CALL, SINGLE_PASS, SKILLS_QUERY, EXPERIENCE_QUERY, MATCH_QUERY, SINGLE_PASS_QUERY,
+                             analyze_resume, skills_context, experience_context, match_context, parse_match_output,
+                             parse_single_pass_output)
+
+# Default number of resumes analysed at once in bulk mode (threaded path)
+DEFAULT_BULK_WORKERS = os.cpu_count() or 1
+
+# Bulk jobs send their prompts through the batched pipeline when transformers is available
+BATCHED_INFERENCE = True
+
+# Resumes whose prompts are batched together before their results are yielded
+BATCH_WINDOW = 32
+
+def read_resume_file(resume_file):
+    """(filename, text) for an uploaded file, or for an already-read (filename, text) pair"""
+    if isinstance(resume_file, tuple):
+        return resume_file
+    return resume_file.name, resume_file.getvalue().decode("utf-8")
+
+def _result(filename, resume_text, analysis):
+    return {
+        "filename": filename,
+        "skills": analysis["skills"],
+        "experience": analysis["experience"],
+        "match_score": analysis["score"],
+        "match_feedback": analysis["feedback"],
+        "resume_text": resume_text  # Include the full text for later use
+    }
+
+def _error(resume_file, error):
+    filename = resume_file[0] if isinstance(resume_file, tuple) else resume_file.name
+    return {
+        "filename": filename,
+        "error": str(error)
+    }
+
+def analyze_resume_file(resume_file, job_description, job_requirements, mode=MULTI_CALL):
+    """Analyze one resume file, returning an error entry for that file if anything fails"""
+    try:
+        filename, resume_text = read_resume_file(resume_file)
+        analysis = analyze_resume(resume_text, job_description, job_requirements, mode)
+        return _result(filename, resume_text, analysis)
+    except Exception as e:
+        return _error(resume_file, e)
+
+def analyze_resumes_batched(resumes, job_description, job_requirements, mode=MULTI_CALL):
+    """Analyze (filename, text) pairs with batched model calls, returning result dicts in input order"""
+    from engine.batching import query_many
+
+    def multi_call(items):
+        pairs = []
+        for _, resume_text in items:
+            pairs += [(SKILLS_QUERY, skills_context(resume_text)), (EXPERIENCE_QUERY, experience_context(resume_text)),
+                      (MATCH_QUERY, match_context(resume_text, job_description, job_requirements))]
+        outputs = query_many(pairs)
+
+        results = []
+        for i, (filename, resume_text) in enumerate(items):
+            skills, experience, match_analysis = outputs[i * 3:i * 3 + 3]
+            analysis = {"skills": skills, "experience": experience, **parse_match_output(match_analysis)}
+            results.append(_result(filename, resume_text, analysis))
+        return results
+
+    if mode != SINGLE_PASS:
+        return multi_call(resumes)
+
+    outputs = query_many([(SINGLE_PASS_QUERY, match_context(resume_text, job_description, job_requirements))
+                          for _, resume_text in resumes])
+    results = [None] * len(resumes)
+    unparsed = []
+    for i, ((filename, resume_text), output) in enumerate(zip(resumes, outputs)):
+        analysis = parse_single_pass_output(output)
+        if analysis:
+            results[i] = _result(filename, resume_text, analysis)
+        else:
+            unparsed.append(i)
+
+    # Same fallback as analyze_resume, batched across every answer that couldn't be parsed
+    if unparsed:
+        for i, result in zip(unparsed, multi_call([resumes[i] for i in unparsed])):
+            results[i] = result
+    return results
+
+def _batched_available():
+    try:
+        from engine.batching import get_pipeline
+        get_pipeline()
+        return True
+    except Exception:
+        # No transformers, or the pipeline won't build: the threaded path reports errors per file
+        return False
+
+def _iter_batched(resume_files, job_description, job_requirements, mode):
+    for start in range(0, len(resume_files), BATCH_WINDOW):
+        readable = []
+        for idx in range(start, min(start + BATCH_WINDOW, len(resume_files))):
+            try:
+                readable.append((idx, read_resume_file(resume_files[idx])))
+            except Exception as e:
+                yield idx, _error(resume_files[idx], e)
+
+        try:
+            results = analyze_resumes_batched([resume for _, resume in readable], job_description, job_requirements, mode)
+        except Exception:
+            # One bad input shouldn't sink the window: redo it a resume at a time, with per-file errors
+            results = [analyze_resume_file(resume, job_description, job_requirements, mode) for _, resume in readable]
+        for (idx, _), result in zip(readable, results):
+            yield idx, result
+
+def iter_bulk_resumes(resume_files, job_description, job_requirements, max_workers=None, mode=MULTI_CALL, batched=None):
+    """Analyze resumes, yielding (input index, result) as each one finishes.
+
+    resume_files may be uploaded files or (filename, text) pairs. With batched inference (the
+    default when transformers is installed) results arrive a window of BATCH_WINDOW resumes at a
+    time; otherwise max_workers threads query the model one prompt at a time, with at most twice
+    max_workers resumes in flight.
+    """
+    if batched is None:
+        batched = BATCHED_INFERENCE
+    if batched and _batched_available():
+        yield from _iter_batched(resume_files, job_description, job_requirements, mode)
+        return
+
+    max_workers = max_workers or DEFAULT_BULK_WORKERS
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = {}
+        next_index = 0
+
+        while next_index < len(resume_files) or in_flight:
+            # Top up the pool without queueing the whole input at once
+            while next_index < len(resume_files) and len(in_flight) < max_workers * 2:
+                future = pool.submit(analyze_resume_file, resume_files[next_index], job_description, job_requirements, mode)
+                in_flight[future] = next_index
+                next_index += 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future.result()
+
+def analyze_bulk(resume_files, job_description, job_requirements, max_workers=None, mode=MULTI_CALL, progress=None):
+    """Analyze resumes concurrently and return the results in input order.
+
+    progress, if given, is called as progress(completed, total, result) on the calling thread
+    after each resume finishes.
+    """
+    results = [None] * len(resume_files)
+    for completed, (idx, result) in enumerate(
+            iter_bulk_resumes(resume_files, job_description, job_requirements, max_workers, mode), start=1):
+        results[idx] = result
+        if progress:
+            progress(completed, len(resume_files), result)
+    return results
@@ -0,0 +1,172 @@
+import math
+import re
+from collections import Counter
+
+# Input token budgets per model call (TeapotAI reads about 512 tokens); generation time grows with these
+RESUME_TOKEN_BUDGET = 384
+MATCH_RESUME_TOKEN_BUDGET = 256
+JOB_TOKEN_BUDGET = 192
+
+# Resume chunks are about this long, so a single section can't crowd out the rest
+CHUNK_TOKENS = 60
+
+# Sentencepiece averages about 1.3 tokens per English word
+TOKENS_PER_WORD = 1.3
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Chunks under a heading that suits the query score this much higher
+HEADING_BOOST = 1.5
+
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "about", "experience", "work experience", "professional experience",
+    "employment", "employment history", "work history", "career history", "education", "skills",
+    "technical skills", "core competencies", "competencies", "expertise", "tools", "technologies",
+    "certifications", "certificates", "licenses", "projects", "achievements", "accomplishments", "awards",
+    "publications", "languages", "leadership", "volunteer", "training", "courses", "interests",
+}
+
+BOILERPLATE = re.compile(
+    r"^(page \d+( of \d+)?|\d+ ?/ ?\d+|curriculum vitae|resume|cv|references( available)?( upon| on)? request\.?"
+    r"|confidential|private (and|&) confidential)$",
+    re.IGNORECASE)
+
+BULLET = re.compile(r"^[\s•·▪●◦‣∙*>–-]+")
+
+def estimate_tokens(text):
+    return int(len((text or "").split()) * TOKENS_PER_WORD) + 1
+
+def normalize_text(text):
+    """Collapse whitespace and drop bullets, page furniture and lines repeated as headers or footers"""
+    lines = [BULLET.sub("", " ".join(line.split())).strip() for line in (text or "").splitlines()]
+    counts = Counter(line.lower() for line in lines if line)
+    kept = []
+    for line in lines:
+        if not line:
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        # Anything repeated three times or more is a running header or footer, not content
+        if BOILERPLATE.match(line) or (counts[line.lower()] >= 3 and len(line) < 80):
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+def _heading(line):
+    """The section name if this line is a heading, else None"""
+    name = line.rstrip(":").strip().lower()
+    if name in SECTION_HEADINGS:
+        return name
+    if len(line) <= 40 and (line.endswith(":") or (line.isupper() and len(name.split()) <= 4)):
+        return name
+    return None
+
+def _pieces(text):
+    """Sentences, with any sentence longer than a chunk broken into chunk-sized runs of words"""
+    words_per_chunk = int(CHUNK_TOKENS / TOKENS_PER_WORD)
+    for sentence in re.split(r"(?<=[.;!?])\s+", text):
+        words = sentence.split()
+        for start in range(0, len(words), words_per_chunk):
+            yield " ".join(words[start:start + words_per_chunk])
+
+def split_sections(text):
+    """(heading, chunk) pairs in document order; text before the first heading has heading ''"""
+    chunks = []
+    heading = ""
+    current = []
+
+    def flush():
+        if current:
+            chunks.append((heading, "\n".join(current)))
+            current.clear()
+
+    for line in normalize_text(text).split("\n"):
+        if not line:
+            continue
+        name = _heading(line)
+        if name is not None:
+            flush()
+            heading = name
+            continue
+        # Long paragraphs are split at sentence boundaries into chunk-sized pieces
+        for sentence in _pieces(line):
+            if current and estimate_tokens(" ".join(current + [sentence])) > CHUNK_TOKENS:
+                flush()
+            current.append(sentence)
+    flush()
+    return chunks
+
+def _terms(text):
+    from vector_index import tokenize
+    return tokenize(text)
+
+def rank_chunks(chunks, focus, headings=()):
+    """BM25 score of each (heading, chunk) against the focus text, boosted under matching headings"""
+    query_terms = set(_terms(focus))
+    documents = [_terms(f"{heading} {chunk}") for heading, chunk in chunks]
+    average_length = sum(len(terms) for terms in documents) / len(documents) or 1
+    document_frequency = Counter(term for terms in documents for term in set(terms))
+
+    scores = []
+    for (heading, _), terms in zip(chunks, documents):
+        frequencies = Counter(terms)
+        score = 0.0
+        for term in query_terms & frequencies.keys():
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            tf = frequencies[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / average_length))
+        if heading and any(name in heading for name in headings):
+            score = (score + 1) * HEADING_BOOST
+        scores.append(score)
+    return scores
+
+def build_context(text, focus, budget=RESUME_TOKEN_BUDGET, headings=()):
+    """The text itself if it fits the token budget, otherwise its chunks most relevant to focus.
+
+    Chosen chunks keep their document order and section headings; repeated chunks are sent once.
+    Short documents are passed through untouched so their cached model outputs stay valid.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    chunks = split_sections(text)
+    if not chunks:
+        return ""
+    scores = rank_chunks(chunks, focus, headings)
+
+    # Best chunks first; chunks sharing no terms with the focus only fill in when nothing matched
+    ranked = sorted((i for i in range(len(chunks)) if scores[i] > 0), key=lambda i: -scores[i])
+    if not ranked:
+        ranked = range(len(chunks))
+
+    chosen = []
+    seen = set()
+    used = 0
+    for i in ranked:
+        cost = estimate_tokens(chunks[i][1])
+        if used + cost <= budget and chunks[i][1] not in seen:
+            chosen.append(i)
+            seen.add(chunks[i][1])
+            used += cost
+
+    parts = []
+    heading = None
+    for i in sorted(chosen):
+        if chunks[i][0] and chunks[i][0] != heading:
+            parts.append(f"{chunks[i][0].title()}:")
+        heading = chunks[i][0]
+        parts.append(chunks[i][1])
+    return "\n".join(parts)
+
+def fit_to_budget(text, budget):
+    """Normalized text cut to the budget at a sentence boundary, keeping the beginning"""
+    if estimate_tokens(text) <= budget:
+        return text
+    kept = []
+    for sentence in _pieces(normalize_text(text)):
+        if estimate_tokens(" ".join(kept + [sentence])) > budget:
+            break
+        kept.append(sentence)
+    return " ".join(kept)
@@ -0,0 +1,127 @@
+import os
+import threading
+import metrics
+import model_cache
+
+# Identifies the model and prompt wording in cached outputs; bump PROMPT_VERSION when a prompt changes
+MODEL_ID = "teapotai/teapotllm"
+PROMPT_VERSION = 2
+
+# Inference backends: TeapotAI as shipped, its weights dynamically quantized to int8, or an ONNX Runtime export
+TEAPOT = "teapot"
+INT8 = "int8"
+ONNX = "onnx"
+BACKENDS = (TEAPOT, INT8, ONNX)
+
+# Chosen per deployment; run benchmark_backends.py before switching away from the default
+BACKEND = os.environ.get("TEAPOT_BACKEND", TEAPOT)
+
+_model = None
+_model_lock = threading.Lock()
+_stale_outputs_cleared = False
+
+def load_model(backend=TEAPOT):
+    """Build a new TeapotAI instance running on the given backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    from teapotai import TeapotAI
+    model = TeapotAI()
+    if backend == TEAPOT:
+        return model
+
+    # Both alternatives swap the seq2seq model TeapotAI generates with, so prompts and decoding stay the same
+    if not hasattr(model, "model"):
+        raise RuntimeError(f"This teapotai version doesn't expose its model, so the {backend} backend can't be used")
+    if backend == INT8:
+        import torch
+        model.model = torch.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            raise RuntimeError("The onnx backend needs optimum with ONNX Runtime: pip install -r requirements-onnx.txt")
+        model.model = ORTModelForSeq2SeqLM.from_pretrained(MODEL_ID, export=True)
+    return model
+
+def cache_model_id(backend=None):
+    """Model id for output cache keys; each backend keeps its own answers"""
+    backend = backend or BACKEND
+    return MODEL_ID if backend == TEAPOT else f"{MODEL_ID}:{backend}"
+
+def get_model():
+    """The shared model on the configured BACKEND, built on first use (safe to call from several threads)"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model(BACKEND)
+    return _model
+
+# A tiny query run once at warm-up so the first real request doesn't pay first-inference overhead
+WARMUP_QUERY = "What programming languages does this candidate know?"
+WARMUP_CONTEXT = "Software engineer with five years of Python and SQL experience."
+
+_ready = threading.Event()
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+_warmup_error = None
+
+def _warm_up():
+    global _warmup_error
+    try:
+        # Straight to the model: a cached answer would skip the inference we want to prime
+        get_model().query(query=WARMUP_QUERY, context=WARMUP_CONTEXT)
+    except Exception as e:
+        _warmup_error = e
+    finally:
+        _ready.set()
+
+def start_warmup():
+    """Load and prime the model in a background thread (once per process); returns immediately"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+        _warmup_thread.start()
+
+def is_ready():
+    """True once warm-up has finished (or failed, in which case the next query retries the load)"""
+    return _ready.is_set()
+
+def wait_until_ready(timeout=None):
+    """Block until warm-up finishes, starting it if nobody has; returns is_ready()"""
+    start_warmup()
+    return _ready.wait(timeout)
+
+metrics.register_gauge("model.ready", lambda: int(is_ready()))
+
+def warmup_error():
+    """The exception that stopped warm-up, if any"""
+    return _warmup_error
+
+def _inference_succeeded():
+    # The model works after all, whatever stopped warm-up
+    global _warmup_error
+    _warmup_error = None
+
+def _clear_stale_outputs():
+    # Outputs cached under an older prompt version can never be hit again
+    global _stale_outputs_cleared
+    if not _stale_outputs_cleared:
+        _stale_outputs_cleared = True
+        model_cache.invalidate(PROMPT_VERSION)
+
+@metrics.instrument("model.query")
+def query(query, context):
+    """Run a TeapotAI query, reusing the stored answer for an identical model/prompt/context"""
+    _clear_stale_outputs()
+    key = model_cache.make_key(cache_model_id(), PROMPT_VERSION, query, context)
+    output = model_cache.get(key)
+    if output is None:
+        with metrics.timed("model.inference"):
+            output = get_model().query(query=query, context=context)
+        _inference_succeeded()
+        model_cache.put(key, output, PROMPT_VERSION)
+    return output
@@ -0,0 +1,198 @@
+"""In-process call timings, counters and gauges for the performance page and metric dumps.
+
+Timers are named by area: "db.<function>", "view.<module>.<function>", "model.query" and so on.
+Everything is per server process and kept in memory; nothing here touches the UI.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+# Optional periodic dump: file path (.prom or .txt for Prometheus text, anything else JSON) and interval
+DUMP_PATH = os.environ.get("METRICS_DUMP_PATH")
+DUMP_INTERVAL_SECONDS = float(os.environ.get("METRICS_DUMP_INTERVAL", "60"))
+
+PROMETHEUS_PREFIX = "hr_portal"
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_gauges = {}
+_dump_thread = None
+
+def record(name, seconds, error=False):
+    """Add one call of the given duration to a timer"""
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+        timer["count"] += 1
+        timer["errors"] += error
+        timer["total"] += seconds
+        timer["max"] = max(timer["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                timer["buckets"][i] += 1
+                break
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def hit_rate(prefix):
+    """Share of "<prefix>.hits" among "<prefix>.hits" and "<prefix>.misses" lookups"""
+    with _lock:
+        hits = _counters.get(f"{prefix}.hits", 0)
+        misses = _counters.get(f"{prefix}.misses", 0)
+    return hits / (hits + misses) if hits + misses else 0.0
+
+def register_gauge(name, read):
+    """Sample read() for this gauge whenever a snapshot is taken"""
+    _gauges[name] = read
+
+@contextmanager
+def timed(name):
+    """Time the with-block under name, counting it as an error if it raises an Exception.
+
+    Other BaseExceptions are control flow (Streamlit's st.rerun() and st.stop(), KeyboardInterrupt),
+    so they pass through without counting as errors.
+    """
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - started, error)
+
+def instrument(name):
+    """Decorator form of timed()"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return function(*args, **kwargs)
+        wrapper.__instrumented__ = True
+        return wrapper
+    return decorate
+
+def instrument_module(module, prefix, skip=()):
+    """Time every public function defined in module, as "<prefix>.<function>".
+
+    Run it at the bottom of the module so later `from module import f` picks up the timed
+    versions. Functions already instrumented are left alone, so repeated calls are harmless.
+    """
+    for name, value in list(vars(module).items()):
+        if (name.startswith("_") or name in skip or not callable(value) or isinstance(value, type)
+                or getattr(value, "__module__", None) != module.__name__ or getattr(value, "__instrumented__", False)):
+            continue
+        setattr(module, name, instrument(f"{prefix}.{name}")(value))
+
+def _percentile(timer, q):
+    """Upper bucket bound holding the q-th quantile (the max for the open-ended bucket)"""
+    target = q * timer["count"]
+    seen = 0
+    for bound, count in zip(BUCKETS, timer["buckets"]):
+        seen += count
+        if count and seen >= target:
+            return timer["max"] if math.isinf(bound) else min(bound, timer["max"])
+    return timer["max"]
+
+def snapshot():
+    """Timers (with mean and estimated percentiles), counters and sampled gauges"""
+    with _lock:
+        timers = {name: {**timer, "buckets": list(timer["buckets"])} for name, timer in _timers.items()}
+        counters = dict(_counters)
+
+    for timer in timers.values():
+        timer["mean"] = timer["total"] / timer["count"] if timer["count"] else 0.0
+        for q in (50, 95, 99):
+            timer[f"p{q}"] = _percentile(timer, q / 100)
+
+    gauges = {}
+    for name, read in list(_gauges.items()):
+        try:
+            gauges[name] = read()
+        except Exception:
+            gauges[name] = None
+    return {"timers": timers, "counters": counters, "gauges": gauges, "taken_at": time.time()}
+
+def reset():
+    """Forget every timing and counter (gauges are live readings and stay)"""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def to_prometheus(data=None):
+    """A snapshot in the Prometheus text exposition format"""
+    data = data or snapshot()
+    lines = [f"# TYPE {PROMETHEUS_PREFIX}_call_duration_seconds histogram"]
+    for name, timer in sorted(data["timers"].items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, timer["buckets"]):
+            cumulative += count
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(f'{PROMETHEUS_PREFIX}_call_duration_seconds_bucket{{name="{_label(name)}",le="{le}"}} {cumulative}')
+        lines.append(f'{PROMETHEUS_PREFIX}_call_duration_seconds_sum{{name="{_label(name)}"}} {timer["total"]}')
+        lines.append(f'{PROMETHEUS_PREFIX}_call_duration_seconds_count{{name="{_label(name)}"}} {timer["count"]}')
+
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_call_errors_total counter")
+    for name, timer in sorted(data["timers"].items()):
+        lines.append(f'{PROMETHEUS_PREFIX}_call_errors_total{{name="{_label(name)}"}} {timer["errors"]}')
+
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_events_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'{PROMETHEUS_PREFIX}_events_total{{name="{_label(name)}"}} {value}')
+
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_gauge gauge")
+    for name, value in sorted(data["gauges"].items()):
+        if isinstance(value, (int, float)):
+            lines.append(f'{PROMETHEUS_PREFIX}_gauge{{name="{_label(name)}"}} {float(value)}')
+    return "\n".join(lines) + "\n"
+
+def dump(path):
+    """Write a snapshot to path, as Prometheus text for .prom/.txt files and JSON otherwise"""
+    if path.endswith((".prom", ".txt")):
+        content = to_prometheus()
+    else:
+        content = json.dumps(snapshot(), indent=2, default=str)
+    # Readers never see a half-written file
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temporary, path)
+
+def _dump_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            dump(path)
+        except OSError:
+            pass
+
+def start_periodic_dump(path=None, interval=None):
+    """Dump metrics to path every interval seconds in a daemon thread (once per process).
+
+    Defaults come from METRICS_DUMP_PATH and METRICS_DUMP_INTERVAL; without a path this does nothing.
+    """
+    global _dump_thread
+    path = path or DUMP_PATH
+    if not path:
+        return
+    with _lock:
+        if _dump_thread is not None:
+            return
+        _dump_thread = threading.Thread(target=_dump_periodically, args=(path, interval or DUMP_INTERVAL_SECONDS),
+                                        name="metrics-dump", daemon=True)
+        _dump_thread.start()
@@ -0,0 +1,379 @@
+def _backfill_salary_columns(conn):
+    """Parse salary_range into salary_min/salary_max for jobs posted before the columns existed"""
+    from database import parse_salary_range
+
+    rows = conn.execute("""SELECT id, salary_range FROM jobs /* full-scan: one-off backfill */
+                           WHERE salary_range != ''""").fetchall()
+    updates = [parse_salary_range(salary_range) + (job_id,) for job_id, salary_range in rows]
+    conn.executemany("UPDATE jobs SET salary_min = ?, salary_max = ? WHERE id = ?", updates)
+
+def _backfill_skills(conn):
+    """Link every existing application and job to its canonical skills"""
+    from database import link_application_skills, link_job_skills
+
+    rows = conn.execute("""SELECT id, extracted_skills, resume FROM applications
+                           /* full-scan: one-off backfill */""").fetchall()
+    for application_id, skills_text, resume in rows:
+        link_application_skills(conn, application_id, skills_text, resume)
+
+    rows = conn.execute("""SELECT id, title, description, requirements FROM jobs
+                           /* full-scan: one-off backfill */""").fetchall()
+    for job_id, title, description, requirements in rows:
+        link_job_skills(conn, job_id, title, description, requirements)
+
+# Ordered schema migrations. Each entry is (version, description, steps) where a
+# step is either a SQL statement or a callable that receives the connection.
+# Never edit a migration that has shipped - append a new one instead.
+MIGRATIONS = [
+    (1, "Base tables", [
+        '''CREATE TABLE IF NOT EXISTS users (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           username TEXT UNIQUE,
+           password TEXT,
+           is_admin INTEGER,
+           email TEXT,
+           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE TABLE IF NOT EXISTS jobs (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           title TEXT,
+           description TEXT,
+           posted_by TEXT,
+           requirements TEXT,
+           salary_range TEXT,
+           location TEXT,
+           job_type TEXT,
+           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+        '''CREATE TABLE IF NOT EXISTS applications (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           username TEXT,
+           job_id INTEGER,
+           resume TEXT,
+           extracted_skills TEXT,
+           extracted_exp TEXT,
+           match_score REAL,
+           match_feedback TEXT,
+           application_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+           status TEXT DEFAULT 'Pending',
+           FOREIGN KEY(job_id) REFERENCES jobs(id),
+           FOREIGN KEY(username) REFERENCES users(username))''',
+    ]),
+    (2, "Indexes for hot query paths", [
+        # Applications for a job, ranked by score (also serves per-job COUNT/AVG)
+        '''CREATE INDEX IF NOT EXISTS idx_applications_job_score
+           ON applications(job_id, match_score DESC)''',
+        # Applications for a job filtered by status
+        '''CREATE INDEX IF NOT EXISTS idx_applications_job_status
+           ON applications(job_id, status)''',
+        # Candidate history, covering the candidate dashboard aggregates
+        '''CREATE INDEX IF NOT EXISTS idx_applications_user_date
+           ON applications(username, application_date DESC, job_id, match_score, status)''',
+        # Employer job listings, newest first
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_posted_by_created
+           ON jobs(posted_by, created_at DESC)''',
+        # Job board, newest first
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_created
+           ON jobs(created_at DESC)''',
+        # Browse filter dropdowns
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_job_type ON jobs(job_type)''',
+        "ANALYZE",
+    ]),
+    (3, "Full-text search over jobs", [
+        # External-content FTS5 index, so job text is stored only once
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+           title, description, requirements,
+           content='jobs', content_rowid='id',
+           tokenize='porter unicode61', prefix='2 3')''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+               INSERT INTO jobs_fts (rowid, title, description, requirements)
+               VALUES (new.id, new.title, new.description, new.requirements);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+               INSERT INTO jobs_fts (jobs_fts, rowid, title, description, requirements)
+               VALUES ('delete', old.id, old.title, old.description, old.requirements);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, description, requirements ON jobs BEGIN
+               INSERT INTO jobs_fts (jobs_fts, rowid, title, description, requirements)
+               VALUES ('delete', old.id, old.title, old.description, old.requirements);
+               INSERT INTO jobs_fts (rowid, title, description, requirements)
+               VALUES (new.id, new.title, new.description, new.requirements);
+           END''',
+        # Backfill jobs that were posted before the index existed
+        "INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')",
+    ]),
+    (4, "Keyset pagination indexes", [
+        # Pages are ordered by (sort key, id), so the id tie-breaker has to be in the index
+        "DROP INDEX IF EXISTS idx_applications_job_score",
+        "DROP INDEX IF EXISTS idx_applications_job_status",
+        "DROP INDEX IF EXISTS idx_applications_user_date",
+        "DROP INDEX IF EXISTS idx_jobs_created",
+        '''CREATE INDEX IF NOT EXISTS idx_applications_job_score
+           ON applications(job_id, match_score DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_applications_job_status_score
+           ON applications(job_id, status, match_score DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_applications_user_date
+           ON applications(username, application_date DESC, id DESC, job_id, match_score, status)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_created
+           ON jobs(created_at DESC, id DESC)''',
+        "ANALYZE",
+    ]),
+    (5, "Trigger-maintained per-job statistics", [
+        '''CREATE TABLE IF NOT EXISTS job_stats (
+           job_id INTEGER PRIMARY KEY,
+           application_count INTEGER NOT NULL DEFAULT 0,
+           scored_count INTEGER NOT NULL DEFAULT 0,
+           score_sum REAL NOT NULL DEFAULT 0,
+           min_score REAL,
+           max_score REAL,
+           pending_count INTEGER NOT NULL DEFAULT 0,
+           interview_count INTEGER NOT NULL DEFAULT 0,
+           accepted_count INTEGER NOT NULL DEFAULT 0,
+           rejected_count INTEGER NOT NULL DEFAULT 0,
+           last_application_at TIMESTAMP,
+           FOREIGN KEY(job_id) REFERENCES jobs(id))''',
+        '''CREATE TRIGGER IF NOT EXISTS job_stats_job_insert AFTER INSERT ON jobs BEGIN
+               INSERT OR IGNORE INTO job_stats (job_id) VALUES (new.id);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS job_stats_job_delete AFTER DELETE ON jobs BEGIN
+               DELETE FROM job_stats WHERE job_id = old.id;
+           END''',
+        # New applications only ever widen min/max, so those are updated incrementally
+        '''CREATE TRIGGER IF NOT EXISTS job_stats_application_insert AFTER INSERT ON applications BEGIN
+               INSERT OR IGNORE INTO job_stats (job_id) VALUES (new.job_id);
+               UPDATE job_stats SET
+                   application_count = application_count + 1,
+                   scored_count = scored_count + (new.match_score IS NOT NULL),
+                   score_sum = score_sum + COALESCE(new.match_score, 0),
+                   min_score = CASE WHEN min_score IS NULL OR new.match_score < min_score
+                                    THEN COALESCE(new.match_score, min_score) ELSE min_score END,
+                   max_score = CASE WHEN max_score IS NULL OR new.match_score > max_score
+                                    THEN COALESCE(new.match_score, max_score) ELSE max_score END,
+                   pending_count = pending_count + (new.status IS 'Pending'),
+                   interview_count = interview_count + (new.status IS 'Interview'),
+                   accepted_count = accepted_count + (new.status IS 'Accepted'),
+                   rejected_count = rejected_count + (new.status IS 'Rejected'),
+                   last_application_at = CASE WHEN last_application_at IS NULL
+                                                   OR new.application_date > last_application_at
+                                              THEN new.application_date ELSE last_application_at END
+               WHERE job_id = new.job_id;
+           END''',
+        # Removing a row can shrink min/max, so those are re-read through idx_applications_job_score
+        '''CREATE TRIGGER IF NOT EXISTS job_stats_application_delete AFTER DELETE ON applications BEGIN
+               UPDATE job_stats SET
+                   application_count = application_count - 1,
+                   scored_count = scored_count - (old.match_score IS NOT NULL),
+                   score_sum = score_sum - COALESCE(old.match_score, 0),
+                   min_score = (SELECT MIN(match_score) FROM applications WHERE job_id = old.job_id),
+                   max_score = (SELECT MAX(match_score) FROM applications WHERE job_id = old.job_id),
+                   pending_count = pending_count - (old.status IS 'Pending'),
+                   interview_count = interview_count - (old.status IS 'Interview'),
+                   accepted_count = accepted_count - (old.status IS 'Accepted'),
+                   rejected_count = rejected_count - (old.status IS 'Rejected'),
+                   last_application_at = (SELECT MAX(application_date) FROM applications
+                                          WHERE job_id = old.job_id)
+               WHERE job_id = old.job_id;
+           END''',
+        # An update is the old row leaving its job followed by the new row arriving
+        '''CREATE TRIGGER IF NOT EXISTS job_stats_application_update
+           AFTER UPDATE OF job_id, match_score, status, application_date ON applications BEGIN
+               UPDATE job_stats SET
+                   application_count = application_count - 1,
+                   scored_count = scored_count - (old.match_score IS NOT NULL),
+                   score_sum = score_sum - COALESCE(old.match_score, 0),
+                   min_score = (SELECT MIN(match_score) FROM applications WHERE job_id = old.job_id),
+                   max_score = (SELECT MAX(match_score) FROM applications WHERE job_id = old.job_id),
+                   pending_count = pending_count - (old.status IS 'Pending'),
+                   interview_count = interview_count - (old.status IS 'Interview'),
+                   accepted_count = accepted_count - (old.status IS 'Accepted'),
+                   rejected_count = rejected_count - (old.status IS 'Rejected'),
+                   last_application_at = (SELECT MAX(application_date) FROM applications
+                                          WHERE job_id = old.job_id)
+               WHERE job_id = old.job_id;
+               INSERT OR IGNORE INTO job_stats (job_id) VALUES (new.job_id);
+               UPDATE job_stats SET
+                   application_count = application_count + 1,
+                   scored_count = scored_count + (new.match_score IS NOT NULL),
+                   score_sum = score_sum + COALESCE(new.match_score, 0),
+                   min_score = CASE WHEN min_score IS NULL OR new.match_score < min_score
+                                    THEN COALESCE(new.match_score, min_score) ELSE min_score END,
+                   max_score = CASE WHEN max_score IS NULL OR new.match_score > max_score
+                                    THEN COALESCE(new.match_score, max_score) ELSE max_score END,
+                   pending_count = pending_count + (new.status IS 'Pending'),
+                   interview_count = interview_count + (new.status IS 'Interview'),
+                   accepted_count = accepted_count + (new.status IS 'Accepted'),
+                   rejected_count = rejected_count + (new.status IS 'Rejected'),
+                   last_application_at = CASE WHEN last_application_at IS NULL
+                                                   OR new.application_date > last_application_at
+                                              THEN new.application_date ELSE last_application_at END
+               WHERE job_id = new.job_id;
+           END''',
+        # Backfill statistics for existing jobs
+        '''INSERT OR REPLACE INTO job_stats
+           SELECT j.id, COUNT(a.id), COUNT(a.match_score), COALESCE(SUM(a.match_score), 0),
+                  MIN(a.match_score), MAX(a.match_score),
+                  SUM(a.status IS 'Pending'), SUM(a.status IS 'Interview'),
+                  SUM(a.status IS 'Accepted'), SUM(a.status IS 'Rejected'),
+                  MAX(a.application_date)
+           FROM jobs j
+           LEFT JOIN applications a ON a.job_id = j.id
+           GROUP BY j.id''',
+    ]),
+    (6, "Parsed salary columns and browse indexes", [
+        "ALTER TABLE jobs ADD COLUMN salary_min REAL",
+        "ALTER TABLE jobs ADD COLUMN salary_max REAL",
+        _backfill_salary_columns,
+        # Each browse filter (none, location, job type) crossed with each sort order.
+        # Missing salaries sort last, so the sort keys are indexed as expressions.
+        "DROP INDEX IF EXISTS idx_jobs_location",
+        "DROP INDEX IF EXISTS idx_jobs_job_type",
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_location_created
+           ON jobs(location, created_at DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_job_type_created
+           ON jobs(job_type, created_at DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_salary_high
+           ON jobs(COALESCE(salary_max, -1) DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_location_salary_high
+           ON jobs(location, COALESCE(salary_max, -1) DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_job_type_salary_high
+           ON jobs(job_type, COALESCE(salary_max, -1) DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_salary_low
+           ON jobs(COALESCE(salary_min, 1e18), id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_location_salary_low
+           ON jobs(location, COALESCE(salary_min, 1e18), id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_job_type_salary_low
+           ON jobs(job_type, COALESCE(salary_min, 1e18), id)''',
+        "ANALYZE",
+    ]),
+    (7, "Normalized skills", [
+        '''CREATE TABLE IF NOT EXISTS skills (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           name TEXT UNIQUE NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS application_skills (
+           application_id INTEGER NOT NULL REFERENCES applications(id),
+           skill_id INTEGER NOT NULL REFERENCES skills(id),
+           PRIMARY KEY (application_id, skill_id)) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS job_skills (
+           job_id INTEGER NOT NULL REFERENCES jobs(id),
+           skill_id INTEGER NOT NULL REFERENCES skills(id),
+           PRIMARY KEY (job_id, skill_id)) WITHOUT ROWID''',
+        # Who has / who needs a skill
+        '''CREATE INDEX IF NOT EXISTS idx_application_skills_skill
+           ON application_skills(skill_id, application_id)''',
+        '''CREATE INDEX IF NOT EXISTS idx_job_skills_skill
+           ON job_skills(skill_id, job_id)''',
+        '''CREATE TRIGGER IF NOT EXISTS application_skills_delete AFTER DELETE ON applications BEGIN
+               DELETE FROM application_skills WHERE application_id = old.id;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS job_skills_delete AFTER DELETE ON jobs BEGIN
+               DELETE FROM job_skills WHERE job_id = old.id;
+           END''',
+        _backfill_skills,
+        "ANALYZE",
+    ]),
+    (8, "Background scoring state", [
+        # queued -> scoring -> done | failed; match_score stays NULL until scoring is done
+        "ALTER TABLE applications ADD COLUMN scoring_status TEXT NOT NULL DEFAULT 'done'",
+        # Only unfinished rows are indexed, so the startup recovery scan stays tiny
+        '''CREATE INDEX IF NOT EXISTS idx_applications_scoring
+           ON applications(scoring_status, id) WHERE scoring_status IN ('queued', 'scoring')''',
+    ]),
+    (9, "Durable bulk analysis runs", [
+        # status: running -> completed; interrupted runs stay 'running' until resumed
+        '''CREATE TABLE IF NOT EXISTS bulk_runs (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           employer TEXT NOT NULL,
+           job_id INTEGER NOT NULL,
+           mode TEXT NOT NULL,
+           workers INTEGER,
+           status TEXT NOT NULL DEFAULT 'running',
+           total_count INTEGER NOT NULL DEFAULT 0,
+           done_count INTEGER NOT NULL DEFAULT 0,
+           failed_count INTEGER NOT NULL DEFAULT 0,
+           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+           finished_at TIMESTAMP,
+           FOREIGN KEY(job_id) REFERENCES jobs(id),
+           FOREIGN KEY(employer) REFERENCES users(username))''',
+        # One row per uploaded file. The resume text is kept so a run can resume after a restart.
+        # status: pending -> done | failed
+        '''CREATE TABLE IF NOT EXISTS bulk_run_items (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           run_id INTEGER NOT NULL,
+           position INTEGER NOT NULL,
+           filename TEXT,
+           resume_text TEXT,
+           status TEXT NOT NULL DEFAULT 'pending',
+           skills TEXT,
+           experience TEXT,
+           match_score REAL,
+           match_feedback TEXT,
+           error TEXT,
+           finished_at TIMESTAMP,
+           FOREIGN KEY(run_id) REFERENCES bulk_runs(id))''',
+        # Pending items in upload order, and finished items ranked by score
+        '''CREATE INDEX IF NOT EXISTS idx_bulk_run_items_run_status
+           ON bulk_run_items(run_id, status, match_score DESC, position)''',
+        '''CREATE INDEX IF NOT EXISTS idx_bulk_runs_employer
+           ON bulk_runs(employer, created_at DESC, id DESC)''',
+        '''CREATE INDEX IF NOT EXISTS idx_bulk_runs_running
+           ON bulk_runs(status, id) WHERE status = 'running' ''',
+    ]),
+    (10, "Stricter salary parsing", [
+        # Re-parse with currency/suffix-anchored amounts and annualized hourly rates
+        _backfill_salary_columns,
+    ]),
+    (11, "Bulk run errors", [
+        # status may also be 'failed': the worker crashed, error says why, pending files can be resumed
+        "ALTER TABLE bulk_runs ADD COLUMN error TEXT",
+    ]),
+    (12, "Lakh and crore salaries", [
+        # "₹12 lakh" and "10-12 LPA" were stored as 12 before the Indian multipliers were parsed
+        _backfill_salary_columns,
+    ]),
+    (13, "Unambiguous skill aliases", [
+        # Links are insert-only, so drop the ones short aliases like "hr" or "ts" matched and relink
+        "DELETE FROM application_skills",
+        "DELETE FROM job_skills",
+        _backfill_skills,
+    ]),
+]
+
+def get_schema_version(conn):
+    """Return the highest migration version applied to this database"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Apply every pending migration in order, each in its own transaction"""
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, steps in migrations:
+        if version <= current:
+            continue
+
+        # Take the write lock up front so concurrent app processes migrate one at a time
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (version, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    return applied
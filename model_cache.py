@@ -0,0 +1,136 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import metrics
+
+# Cache settings
+CACHE_PATH = "teapot_cache.db"
+CACHE_MAX_ENTRIES = 20000
+BUSY_TIMEOUT_MS = 5000
+# Hits update last_used in batches of this many, so a cache hit doesn't cost a write
+TOUCH_BATCH_SIZE = 256
+
+CACHE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS model_outputs (
+        key TEXT PRIMARY KEY,
+        prompt_version TEXT NOT NULL,
+        output TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_model_outputs_last_used ON model_outputs(last_used)",
+]
+
+# One connection shared by every thread; sqlite calls are serialised by the lock
+_conn = None
+_lock = threading.Lock()
+_entries = None
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# key -> time of the last hit not yet written to last_used. Lost on exit, which only
+# makes eviction slightly less recent-aware.
+_touched = {}
+
+def init_cache(conn):
+    """Create the cache table on a connection"""
+    for statement in CACHE_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+def _connection():
+    """Open the cache database on first use (caller holds the lock)"""
+    global _conn, _entries
+    if _conn is None:
+        conn = sqlite3.connect(CACHE_PATH, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        init_cache(conn)
+        _entries = conn.execute("SELECT COUNT(*) FROM model_outputs").fetchone()[0]
+        _conn = conn
+    return _conn
+
+def make_key(model_id, prompt_version, query, context):
+    """Content hash identifying one model call"""
+    digest = hashlib.sha256()
+    for part in (model_id, str(prompt_version), query, context):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _flush_touches(conn):
+    """Write pending hit times to last_used (caller holds the lock and commits)"""
+    if _touched:
+        conn.executemany("UPDATE model_outputs SET last_used = ? WHERE key = ?",
+                         [(used, key) for key, used in _touched.items()])
+        _touched.clear()
+
+def get(key):
+    """Return the cached output for a key, or None"""
+    with _lock:
+        conn = _connection()
+        row = conn.execute("SELECT output FROM model_outputs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+        _touched[key] = time.time()
+        if len(_touched) >= TOUCH_BATCH_SIZE:
+            _flush_touches(conn)
+            conn.commit()
+        _stats["hits"] += 1
+        return row[0]
+
+def put(key, output, prompt_version):
+    """Store a model output, evicting the least recently used entries past CACHE_MAX_ENTRIES"""
+    global _entries
+    now = time.time()
+    with _lock:
+        conn = _connection()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO model_outputs (key, prompt_version, output, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, str(prompt_version), output, now, now)
+        )
+        _entries += cursor.rowcount
+
+        if _entries > CACHE_MAX_ENTRIES:
+            # Evict by up-to-date recency
+            _flush_touches(conn)
+            overflow = _entries - CACHE_MAX_ENTRIES
+            cursor = conn.execute(
+                "DELETE FROM model_outputs WHERE key IN (SELECT key FROM model_outputs ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            _entries -= cursor.rowcount
+            _stats["evictions"] += cursor.rowcount
+        conn.commit()
+
+def invalidate(prompt_version=None):
+    """Drop entries written under any other prompt version, or everything when no version is given"""
+    global _entries
+    with _lock:
+        conn = _connection()
+        _flush_touches(conn)
+        if prompt_version is None:
+            conn.execute("DELETE FROM model_outputs")
+        else:
+            conn.execute(
+                "DELETE FROM model_outputs WHERE prompt_version != ? /* full-scan: prompt changes are rare */",
+                (str(prompt_version),)
+            )
+        conn.commit()
+        _entries = conn.execute("SELECT COUNT(*) FROM model_outputs").fetchone()[0]
+
+def cache_stats():
+    """Hit/miss counters for this process plus the current number of entries"""
+    with _lock:
+        _connection()
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": _entries,
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0
+        }
+
+metrics.register_gauge("model_cache.hit_rate", lambda: cache_stats()["hit_rate"])
+metrics.register_gauge("model_cache.entries", lambda: cache_stats()["entries"])
@@ -0,0 +1,63 @@
+import queue
+import threading
+import metrics
+from engine import wait_until_ready
+from database import (get_application_for_scoring, save_application_score, mark_scoring_failed,
+                      get_unscored_application_ids)
+
+# Applications are scored one at a time per worker; the model saturates the CPU on its own
+SCORING_WORKERS = 1
+
+_queue = queue.Queue()
+_workers = []
+_workers_lock = threading.Lock()
+
+def enqueue(application_id):
+    """Queue a stored application for background analysis"""
+    _queue.put(application_id)
+
+def queue_depth():
+    """Applications waiting for a worker in this process"""
+    return _queue.qsize()
+
+metrics.register_gauge("scoring_queue.depth", queue_depth)
+
+def score_application(application_id):
+    """Run the full resume analysis for one application and store the result"""
+    from engine import analyze_resume
+
+    row = get_application_for_scoring(application_id)
+    if row is None:
+        return
+    resume, job_description, job_requirements = row
+    try:
+        analysis = analyze_resume(resume, job_description, job_requirements)
+    except Exception as e:
+        mark_scoring_failed(application_id, e)
+        return
+    save_application_score(application_id, analysis["skills"], analysis["experience"],
+                           analysis["score"], analysis["feedback"])
+
+def _work():
+    # Queued applications wait here for the startup warm-up instead of racing it
+    wait_until_ready()
+    while True:
+        application_id = _queue.get()
+        try:
+            score_application(application_id)
+        except Exception as e:
+            mark_scoring_failed(application_id, e)
+        finally:
+            _queue.task_done()
+
+def start_scoring_workers():
+    """Start the scoring threads once per process and re-queue work a restart interrupted"""
+    with _workers_lock:
+        if _workers:
+            return
+        for application_id in get_unscored_application_ids():
+            enqueue(application_id)
+        for i in range(SCORING_WORKERS):
+            worker = threading.Thread(target=_work, name=f"scoring-worker-{i}", daemon=True)
+            worker.start()
+            _workers.append(worker)
@@ -0,0 +1,238 @@
+"""Fill the portal database with synthetic employers, candidates, jobs and applications.
+
+Usage:
+    python seed_database.py                      # a small data set, in seconds
+    python seed_database.py --employers 10000 --candidates 500000 --jobs 500000 --applications 5000000
+
+Rows go through the normal schema and triggers (search index, job statistics), so the result
+behaves like a portal that grew to that size. Text lengths, salaries, locations, statuses and
+scores follow rough real-world distributions, and a few popular jobs attract most applications.
+Seeded accounts use the password "password". Use --db to seed a copy rather than the live file.
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import sys
+import time
+
+import database
+from migrations import apply_migrations
+from skills import SKILL_TAXONOMY
+
+# Job families: titles and the canonical skills their jobs ask for and their candidates list
+JOB_FAMILIES = {
+    "Backend Developer": ["Python", "Java", "Go", "SQL", "REST APIs", "Microservices", "Docker", "AWS"],
+    "Frontend Developer": ["JavaScript", "TypeScript", "React", "Angular", "Vue", "HTML/CSS"],
+    "Full Stack Engineer": ["JavaScript", "Node.js", "React", "Python", "SQL", "Docker"],
+    "Data Engineer": ["Python", "SQL", "Data Engineering", "NoSQL", "GCP", "AWS"],
+    "Data Scientist": ["Python", "R", "SQL", "Machine Learning", "Deep Learning", "Data Visualization"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "Terraform", "AWS", "Linux", "CI/CD"],
+    "Mobile Developer": ["Swift", "Kotlin", "React", "REST APIs"],
+    "Project Manager": ["Agile", "Project Management", "Communication", "Leadership", "Teamwork"],
+    "Marketing Specialist": ["Marketing", "Writing", "Data Analysis", "Communication", "Sales"],
+    "Financial Analyst": ["Excel", "Finance", "Accounting", "SQL", "Data Analysis"],
+}
+SENIORITIES = ["Junior", "", "", "Senior", "Lead", "Principal"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA", "Chicago, IL",
+             "Boston, MA", "London, UK", "Berlin, Germany", "Toronto, Canada", "Bangalore, India"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract", "Remote", "Internship"]
+JOB_TYPE_WEIGHTS = [70, 5, 15, 8, 2]
+STATUSES = ["Pending", "Interview", "Accepted", "Rejected"]
+STATUS_WEIGHTS = [55, 20, 5, 20]
+
+# Filler sentences; resumes and job posts are assembled from these plus skill mentions
+RESUME_SENTENCES = [
+    "Designed and shipped features used by thousands of customers every day.",
+    "Collaborated with product, design and support teams to plan quarterly roadmaps.",
+    "Mentored junior colleagues and ran weekly knowledge-sharing sessions.",
+    "Reduced operating costs by automating manual reporting and review steps.",
+    "Led the migration of a legacy system with no customer-facing downtime.",
+    "Improved page load and response times through profiling and caching.",
+    "Presented results to senior leadership and external stakeholders.",
+    "Wrote documentation, runbooks and onboarding material for new hires.",
+    "Owned on-call rotation and incident reviews for a critical service.",
+    "Holds a degree in a quantitative field and several industry certifications.",
+]
+JOB_SENTENCES = [
+    "You will join a small, fast-moving team that owns its work end to end.",
+    "We offer flexible hours, a learning budget and comprehensive health coverage.",
+    "The role reports to the head of the department and works across teams.",
+    "You will help define best practices and raise the bar for quality.",
+    "We value clear written communication and thoughtful collaboration.",
+    "Our customers range from startups to large enterprises worldwide.",
+]
+
+def _families():
+    """Job families limited to skills the taxonomy knows"""
+    return {title: [skill for skill in skills if skill in SKILL_TAXONOMY] for title, skills in JOB_FAMILIES.items()}
+
+def _mention(skill):
+    # Free text mentions a skill by its first alias, which extract_skills recognizes
+    return SKILL_TAXONOMY[skill][0]
+
+def _timestamp(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_users(rng, employers, candidates):
+    for i in range(employers):
+        yield (f"employer{i}", "password", 1, f"hiring{i}@example.com")
+    for i in range(candidates):
+        yield (f"candidate{i}", "password", 0, f"candidate{i}@example.com")
+
+def generate_jobs(rng, count, employers, families, now, days):
+    """(title, description, posted_by, requirements, salary_range, salary_min, salary_max, location,
+    job_type, created_at, skills) rows"""
+    titles = list(families)
+    for _ in range(count):
+        family = rng.choice(titles)
+        title = f"{rng.choice(SENIORITIES)} {family}".strip()
+        skills = rng.sample(families[family], k=min(len(families[family]), rng.randint(3, 5)))
+        description = " ".join(
+            [f"We are hiring a {title} to build and improve our products."]
+            + rng.choices(JOB_SENTENCES, k=rng.randint(4, 12)))
+        requirements = (f"Experience with {', '.join(_mention(skill) for skill in skills)}. "
+                        f"{rng.randint(1, 10)}+ years of relevant experience. "
+                        + " ".join(rng.choices(JOB_SENTENCES, k=rng.randint(1, 3))))
+
+        if rng.random() < 0.8:
+            low = rng.randrange(40, 180, 5)
+            salary_range = f"${low}K-{low + rng.randrange(10, 60, 5)}K"
+            salary_min, salary_max = database.parse_salary_range(salary_range)
+        else:
+            salary_range, salary_min, salary_max = "", None, None
+
+        created_at = now - datetime.timedelta(days=rng.random() * days)
+        yield (title, description, f"employer{rng.randrange(employers)}", requirements, salary_range, salary_min,
+               salary_max, rng.choice(LOCATIONS), rng.choices(JOB_TYPES, JOB_TYPE_WEIGHTS)[0],
+               _timestamp(created_at), skills)
+
+def generate_applications(rng, count, candidates, jobs, families, now, resume_words):
+    """(username, job_id, resume, skills, experience, score, feedback, date, status, scoring_status, skills) rows"""
+    titles = list(families)
+    for _ in range(count):
+        # Squaring the draw makes a minority of jobs collect most of the applications
+        job_id, job_created_at = jobs[int(len(jobs) * rng.random() ** 2)]
+        family = rng.choice(titles)
+        skills = rng.sample(families[family], k=min(len(families[family]), rng.randint(3, 6)))
+        years = rng.randint(0, 20)
+
+        sentences = [f"{family} with {years} years of experience using "
+                     f"{', '.join(_mention(skill) for skill in skills)}."]
+        words = len(sentences[0].split())
+        while words < resume_words:
+            sentence = rng.choice(RESUME_SENTENCES)
+            sentences.append(sentence)
+            words += len(sentence.split())
+        resume = "\n".join(sentences)
+
+        applied_at = min(now, job_created_at + datetime.timedelta(days=rng.random() * 60))
+        if rng.random() < 0.01:
+            score, feedback, scoring_status = None, "Automatic scoring failed: timed out", "failed"
+        else:
+            score = round(min(100.0, max(0.0, rng.gauss(62, 15))), 1)
+            feedback = f"Matches {len(skills)} listed skills. Overall a {'strong' if score >= 70 else 'partial'} fit."
+            scoring_status = "done"
+        yield (f"candidate{rng.randrange(candidates)}", job_id, resume, ", ".join(skills),
+               f"{family} with {years} years of experience.", score, feedback, _timestamp(applied_at),
+               rng.choices(STATUSES, STATUS_WEIGHTS)[0], scoring_status, skills)
+
+def seed(conn, args):
+    rng = random.Random(args.seed)
+    families = _families()
+    now = datetime.datetime.now()
+
+    apply_migrations(conn)
+    conn.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)", [(name,) for name in SKILL_TAXONOMY])
+    skill_ids = dict(conn.execute("SELECT name, id FROM skills /* full-scan: small lookup table */"))
+    conn.commit()
+
+    started = time.monotonic()
+    def report(what, done):
+        print(f"{what}: {done:,} ({time.monotonic() - started:.0f}s)", file=sys.stderr)
+
+    done = 0
+    for batch in _batches(generate_users(rng, args.employers, args.candidates), args.batch_size):
+        conn.executemany("INSERT OR IGNORE INTO users (username, password, is_admin, email) VALUES (?, ?, ?, ?)", batch)
+        conn.commit()
+        done += len(batch)
+    report("users", done)
+
+    # (id, created_at) of every seeded job, for placing applications after their job was posted
+    jobs = []
+    for batch in _batches(generate_jobs(rng, args.jobs, args.employers, families, now, args.days), args.batch_size):
+        for row in batch:
+            cursor = conn.execute("""INSERT INTO jobs (title, description, posted_by, requirements, salary_range,
+                                                       salary_min, salary_max, location, job_type, created_at)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", row[:-1])
+            jobs.append((cursor.lastrowid, datetime.datetime.strptime(row[9], "%Y-%m-%d %H:%M:%S")))
+            conn.executemany("INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)",
+                             [(cursor.lastrowid, skill_ids[skill]) for skill in row[-1]])
+        conn.commit()
+        report("jobs", len(jobs))
+
+    done = 0
+    applications = generate_applications(rng, args.applications, args.candidates, jobs, families, now, args.resume_words)
+    for batch in _batches(applications, args.batch_size):
+        for row in batch:
+            cursor = conn.execute("""INSERT INTO applications (username, job_id, resume, extracted_skills, extracted_exp,
+                                                               match_score, match_feedback, application_date, status,
+                                                               scoring_status)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", row[:-1])
+            conn.executemany("INSERT OR IGNORE INTO application_skills (application_id, skill_id) VALUES (?, ?)",
+                             [(cursor.lastrowid, skill_ids[skill]) for skill in row[-1]])
+        conn.commit()
+        done += len(batch)
+        report("applications", done)
+
+    conn.execute("ANALYZE")
+    conn.commit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the portal database with synthetic data.")
+    parser.add_argument("--db", default=database.DB_PATH, help="database file to seed")
+    parser.add_argument("--employers", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--applications", type=int, default=50000)
+    parser.add_argument("--resume-words", type=int, default=350, help="approximate resume length")
+    parser.add_argument("--days", type=int, default=730, help="jobs are spread over this many past days")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per transaction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-vector-index", action="store_true",
+                        help="leave the similarity index stale (the app and benchmark_database.py rebuild it)")
+    args = parser.parse_args(argv)
+    if min(args.employers, args.candidates) < 1 or (args.applications and not args.jobs):
+        parser.error("need at least one employer and candidate, and jobs for any applications")
+
+    conn = sqlite3.connect(args.db)
+    # Bulk-load settings: a crash mid-seed may corrupt the file, which is fine for generated data
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    try:
+        seed(conn, args)
+    finally:
+        conn.close()
+
+    # The portal's database keeps its index in vector_store/; a seeded copy gets its own beside it
+    if not args.skip_vector_index:
+        import vector_index
+        vector_index.INDEX_DIR = vector_index.index_dir_for(args.db)
+        database.close_connections()
+        database.DB_PATH = args.db
+        print(f"Rebuilding the similarity index in {vector_index.INDEX_DIR}...", file=sys.stderr)
+        vector_index.rebuild_indexes()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import re
+
+# Canonical skill names and the spellings that mean the same thing (matched case-insensitively)
+SKILL_TAXONOMY = {
+    "Python": ["python", "python3"],
+    "Java": ["java", "j2ee", "java ee"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby", "ruby on rails", "rails"],
+    "PHP": ["php", "laravel"],
+    "Swift": ["swift", "ios development"],
+    "Kotlin": ["kotlin", "android development"],
+    "R": ["r programming", "rstudio"],
+    "SQL": ["sql", "mysql", "postgresql", "postgres", "sqlite", "t-sql", "pl/sql", "sql server"],
+    "NoSQL": ["nosql", "mongodb", "mongo", "cassandra", "dynamodb", "redis"],
+    "HTML/CSS": ["html", "css", "html5", "css3", "sass"],
+    "React": ["react", "reactjs", "react.js", "react native"],
+    "Angular": ["angular", "angularjs"],
+    "Vue": ["vue", "vuejs", "vue.js"],
+    "Node.js": ["nodejs", "node.js", "express.js"],
+    "Django": ["django"],
+    "Flask": ["flask", "fastapi"],
+    "Spring": ["spring boot", "spring framework"],
+    ".NET": [".net", "dotnet", "asp.net"],
+    "REST APIs": ["rest api", "rest apis", "restful", "api design", "graphql"],
+    "Microservices": ["microservices", "microservice"],
+    "AWS": ["aws", "amazon web services", "ec2", "aws lambda"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s", "helm"],
+    "Terraform": ["terraform", "infrastructure as code", "iac"],
+    "CI/CD": ["ci/cd", "cicd", "jenkins", "github actions", "gitlab ci", "continuous integration"],
+    "Linux": ["linux", "unix", "bash", "shell scripting"],
+    "Git": ["git", "github", "gitlab", "version control"],
+    "Machine Learning": ["machine learning", "ml", "scikit-learn", "sklearn", "xgboost"],
+    "Deep Learning": ["deep learning", "neural networks", "tensorflow", "pytorch", "keras"],
+    "NLP": ["nlp", "natural language processing", "llm", "llms", "transformers"],
+    "Data Analysis": ["data analysis", "data analytics", "pandas", "numpy", "statistics", "statistical analysis"],
+    "Data Engineering": ["data engineering", "etl", "airflow", "spark", "hadoop", "kafka", "data pipelines"],
+    "Data Visualization": ["data visualization", "tableau", "power bi", "powerbi", "looker", "matplotlib"],
+    "Excel": ["excel", "microsoft excel", "spreadsheets", "vba"],
+    "Cybersecurity": ["cybersecurity", "information security", "network security", "penetration testing", "siem"],
+    "Networking": ["networking", "tcp/ip", "dns", "cisco", "network administration"],
+    "Testing": ["software testing", "quality assurance", "unit testing", "selenium", "test automation", "pytest"],
+    "Agile": ["agile", "scrum", "kanban", "jira"],
+    "Project Management": ["project management", "pmp", "program management", "prince2"],
+    "Product Management": ["product management", "product owner", "roadmapping"],
+    "UX/UI Design": ["ux", "ux design", "ui design", "user experience", "figma", "wireframing"],
+    "Graphic Design": ["graphic design", "photoshop", "illustrator", "adobe creative suite"],
+    "Leadership": ["leadership", "team leadership", "people management", "team management", "mentoring"],
+    "Communication": ["communication", "communication skills", "written communication", "verbal communication",
+                      "presentation skills", "public speaking"],
+    "Teamwork": ["teamwork", "collaboration", "team player", "cross-functional collaboration"],
+    "Problem Solving": ["problem solving", "problem-solving", "critical thinking", "analytical skills", "troubleshooting"],
+    "Customer Service": ["customer service", "customer support", "client relations", "customer success"],
+    "Sales": ["sales", "business development", "b2b sales", "lead generation", "account management"],
+    "Marketing": ["marketing", "digital marketing", "seo", "content marketing", "social media marketing"],
+    "Finance": ["finance", "financial analysis", "financial modeling", "budgeting", "forecasting"],
+    "Accounting": ["accounting", "accountant", "bookkeeping", "gaap", "ifrs", "quickbooks", "auditing"],
+    "Human Resources": ["human resources", "recruiting", "recruitment", "talent acquisition", "onboarding"],
+    "Operations": ["operations management", "logistics", "supply chain", "procurement"],
+    "Healthcare": ["healthcare", "patient care", "nursing", "ehr"],
+    "Teaching": ["teaching", "curriculum development", "lesson planning", "tutoring"],
+    "Writing": ["copywriting", "technical writing", "content writing"],
+    "Research": ["market research", "user research", "qualitative research"],
+}
+
+# Free text is only matched against the aliases, so ambiguous words like "Go" or "Spring"
+# count only when spelled out ("golang", "spring boot"). Short forms that are also common
+# words or abbreviations ("ts", "ui", "hr", "qa", "sem", "emr") are left out for the same reason.
+_ALIASES = {alias: canonical for canonical, aliases in SKILL_TAXONOMY.items() for alias in aliases}
+_CANONICAL = {canonical.lower(): canonical for canonical in SKILL_TAXONOMY}
+MAX_ALIAS_WORDS = max(len(alias.split()) for alias in _ALIASES)
+
+# A leading dot only survives for names like .net
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9+#]")
+
+def normalize_skill(name):
+    """Canonical name for one skill spelling, or None if it is not in the taxonomy"""
+    key = " ".join(TOKEN_PATTERN.findall(name.lower()))
+    return _ALIASES.get(key) or _CANONICAL.get(name.strip().lower())
+
+def extract_skills(text):
+    """Set of canonical skills mentioned anywhere in a comma list or free text"""
+    found = set()
+    if not text:
+        return found
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    for i in range(len(tokens)):
+        for n in range(1, MAX_ALIAS_WORDS + 1):
+            canonical = _ALIASES.get(" ".join(tokens[i:i + n]))
+            if canonical:
+                found.add(canonical)
+    return found
@@ -8,16 +8,30 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
-from views import auth, dashboard, employer, applicant, detail_views
+from views import auth, dashboard, employer, applicant, detail_views, performance
 
 from database import init_db
+from engine import start_warmup
+from scoring_queue import start_scoring_workers
+from bulk_runs import resume_interrupted_runs
+from metrics import start_periodic_dump
 from styles import load_css
 import os
 # Apply custom CSS
 load_css()
 
-# Initialize database connection
-conn = init_db()
+# Initialize database schema
+init_db()
+
+# Start loading the AI model now so the first analysis doesn't wait for it; pages never block on this
+start_warmup()
+
+# Score submitted applications and finish interrupted bulk runs in the background
+start_scoring_workers()
+resume_interrupted_runs()
+
+# Write metrics to METRICS_DUMP_PATH every METRICS_DUMP_INTERVAL seconds, when configured
+start_periodic_dump()
 
 # Initialize session state
 if "user" not in st.session_state:
@@ -44,7 +58,7 @@ display_header()
 # Sidebar navigation
 if st.session_state.user:
     if st.session_state.is_admin:
-        menu = ["Dashboard", "Post Job", "My Job Listings", "Applications", "Bulk Resume Analysis"]
+        menu = ["Dashboard", "Post Job", "My Job Listings", "Applications", "Bulk Resume Analysis", "Performance"]
     else:
         menu = ["Dashboard", "Browse Jobs", "My Applications"]
     
@@ -81,6 +95,8 @@ elif choice == "Applications" and st.session_state.is_admin:
     employer.applications_view()
 elif choice == "Bulk Resume Analysis" and st.session_state.is_admin:
     employer.bulk_analysis_view()
+elif choice == "Performance" and st.session_state.is_admin:
+    performance.performance_view()
 elif choice == "Browse Jobs" and not st.session_state.is_admin:
     applicant.browse_jobs_view()
 elif choice == "My Applications" and not st.session_state.is_admin:
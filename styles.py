@@ -46,6 +46,14 @@ def load_css():
             color: #F44336;
             font-weight: 700;
         }
+        .match-pending {
+            color: #9E9E9E;
+            font-style: italic;
+        }
+        .match-failed {
+            color: #F44336;
+            font-style: italic;
+        }
         .footer {
             text-align: center;
             margin-top: 50px;
@@ -1,5 +1,10 @@
 import streamlit as st
 from utils import display_match_score, display_application_status
+from database import get_scoring_pending, retry_scoring
+from scoring_queue import enqueue as enqueue_scoring
+
+# How often a page with applications still being scored checks for results
+SCORING_REFRESH_SECONDS = 5
 
 def display_job_card(job, show_apply_button=True):
     """Display a job listing card"""
@@ -116,4 +121,54 @@ def display_metrics_dashboard(employer=True, metrics=None):
             st.markdown('<div class="metric-container">', unsafe_allow_html=True)
             st.markdown(f'<div class="metric-value">{max_score:.1f}%</div>', unsafe_allow_html=True)
             st.markdown('<div class="metric-label">Highest Match</div>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+            st.markdown('</div>', unsafe_allow_html=True)
+
+def start_pagination(key, filters=(), page_sizes=(10, 20, 50)):
+    """Return (page_size, cursor) for a paginated list, starting over when the filters change"""
+    page_size = st.selectbox("Results per page", page_sizes, key=f"{key}_page_size")
+    
+    # Keep a stack of cursors so we can step back to earlier pages
+    state_key = f"{key}_pagination"
+    signature = (tuple(filters), page_size)
+    state = st.session_state.get(state_key)
+    if state is None or state["signature"] != signature:
+        state = {"signature": signature, "cursors": [None]}
+        st.session_state[state_key] = state
+    
+    return page_size, state["cursors"][-1]
+
+def page_navigation(key, next_cursor):
+    """Display previous/next buttons for a list started with start_pagination"""
+    state = st.session_state[f"{key}_pagination"]
+    page_number = len(state["cursors"])
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if page_number > 1 and st.button("← Previous", key=f"{key}_prev"):
+            state["cursors"].pop()
+            st.rerun()
+    with col2:
+        st.markdown(f"Page {page_number}")
+    with col3:
+        if next_cursor is not None and st.button("Next →", key=f"{key}_next"):
+            state["cursors"].append(next_cursor)
+            st.rerun()
+
+def refresh_when_scored(application_ids):
+    """Poll while any of these pending applications is still being scored, then rerun the page to show the scores"""
+    if application_ids:
+        _poll_scoring(tuple(sorted(application_ids)))
+
+@st.fragment(run_every=SCORING_REFRESH_SECONDS)
+def _poll_scoring(application_ids):
+    if not get_scoring_pending(application_ids):
+        st.rerun()
+    st.caption(f"⏳ {len(application_ids)} application(s) still being analyzed. "
+               "Scores will appear here automatically.")
+
+def retry_scoring_button(application_id, key):
+    """Queue an application whose analysis failed for another try"""
+    if st.button("🔄 Retry analysis", key=key):
+        if retry_scoring(application_id):
+            enqueue_scoring(application_id)
+        st.rerun()
@@ -4,10 +4,25 @@ import numpy as np
 import altair as alt
 import base64
 from io import StringIO
+from skills import extract_skills
 
-def display_match_score(score):
+def is_scoring_pending(scoring_status):
+    """Whether an application is still waiting for its background analysis"""
+    return scoring_status in ("queued", "scoring")
+
+def format_match_score(score, scoring_status=None):
+    """Plain-text match score, for expander labels and tables"""
+    if score is None:
+        return "⚠️ Scoring failed" if scoring_status == "failed" else "⏳ Scoring..."
+    return f"{score:.1f}%"
+
+def display_match_score(score, scoring_status=None):
     """Display match score with appropriate styling"""
-    if score >= 80:
+    if score is None and scoring_status == "failed":
+        return '<span class="match-failed">⚠️ Scoring failed</span>'
+    elif score is None:
+        return '<span class="match-pending">⏳ Scoring...</span>'
+    elif score >= 80:
         return f'<span class="match-high">{score:.1f}%</span>'
     elif score >= 60:
         return f'<span class="match-medium">{score:.1f}%</span>'
@@ -74,16 +89,16 @@ def generate_match_gauge(score):
     return gauge + text
 
 def generate_skills_match_chart(required_skills, candidate_skills):
-    """Generate a chart showing skill matches between job requirements and candidate"""
-    # This is a placeholder implementation - in a real app, you'd parse skills more thoroughly
-    
-    # For demonstration, create some sample data
-    required = [s.strip() for s in required_skills.lower().split(',')]
-    candidate = [s.strip() for s in candidate_skills.lower().split(',')]
+    """Generate a chart showing skill matches between job requirements and candidate.
+
+    Either argument may be a set of canonical skill names or raw text to extract them from.
+    """
+    required = extract_skills(required_skills) if isinstance(required_skills, str) else set(required_skills)
+    candidate = extract_skills(candidate_skills) if isinstance(candidate_skills, str) else set(candidate_skills)
     
     # Find matches and missing skills
-    matches = [skill for skill in required if any(s in skill for s in candidate)]
-    missing = [skill for skill in required if skill not in matches]
+    matches = sorted(required & candidate)
+    missing = sorted(required - candidate)
     
     # Create a dataframe for visualization
     data = pd.DataFrame({
@@ -107,4 +122,12 @@ def generate_skills_match_chart(required_skills, candidate_skills):
         )
         return chart
     else:
-        return None
\ No newline at end of file
+        return None
+
+def format_skill_match(required_skills, candidate_skills):
+    """One-line summary of which required skills a candidate has"""
+    if not required_skills:
+        return "No recognised skills in the job requirements"
+    missing = sorted(set(required_skills) - set(candidate_skills))
+    summary = f"{len(required_skills) - len(missing)}/{len(required_skills)} required skills"
+    return summary + (f" · Missing: {', '.join(missing)}" if missing else " · All matched")
@@ -0,0 +1,423 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Index settings. INDEX_DIR is where get_index() opens indexes; tools working on another
+# database file point it at index_dir_for() that file.
+PORTAL_INDEX_DIR = "vector_store"
+INDEX_DIR = PORTAL_INDEX_DIR
+DIM = 1024
+INITIAL_CAPACITY = 1024
+# Rows scored per matrix multiply, bounds temporary memory on large indexes
+SEARCH_CHUNK_ROWS = 65536
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "of", "on", "or", "our", "that", "the", "this", "to", "was", "we", "were", "will",
+    "with", "you", "your", "i", "my", "me", "etc"
+}
+
+def tokenize(text):
+    """Lowercase word tokens, keeping tech names like c++, c# and node.js intact"""
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOP_WORDS]
+
+def _lock_file(f, shared):
+    """Block until this process holds the lock file (shared locks need fcntl)"""
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock_file(f):
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _save_array(path, array):
+    # Written aside and renamed, so other processes never load a half-written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(temp_path, path)
+
+def _bucket(token):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode("utf-8")) % DIM
+
+def term_vector(text):
+    """Sublinear hashed term frequencies, L2-normalised"""
+    vector = np.zeros(DIM, dtype=np.float32)
+    for token in tokenize(text):
+        vector[_bucket(token)] += 1.0
+    nonzero = vector > 0
+    vector[nonzero] = 1.0 + np.log(vector[nonzero])
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class VectorIndex:
+    """Hashed term vectors for one kind of document, stored in a memory-mapped matrix.
+
+    Document vectors hold normalised term frequencies only; IDF weights are applied to the
+    query at search time, so adding or removing a document never rewrites other rows.
+
+    Several processes (the app, batch_match.py, seed_database.py) may share the files. Every
+    read or write happens under locked(), which holds a lock file and reloads the index when
+    another process saved it since.
+    """
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.directory = directory or INDEX_DIR
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._shared = False
+        self._lock_handle = None
+        self._dirty = False
+        self._version = ()
+        self.matrix = None
+        os.makedirs(self.directory, exist_ok=True)
+        with self.locked(shared=True):
+            pass
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, f"{self.name}.{suffix}")
+
+    @contextmanager
+    def locked(self, shared=False):
+        """Hold the index against other threads and processes.
+
+        Nested blocks reuse the outermost lock, and changes are saved once when it is released,
+        so a batch of writes flushes the mapped files only once.
+        """
+        with self._lock:
+            outermost = self._depth == 0
+            if outermost:
+                self._lock_handle = open(self._path("lock"), "a+b")
+                try:
+                    _lock_file(self._lock_handle, shared)
+                except BaseException:
+                    self._lock_handle.close()
+                    raise
+                self._shared = shared
+            elif self._shared and not shared:
+                raise RuntimeError(f"cannot write to the {self.name} index under a shared lock")
+
+            self._depth += 1
+            try:
+                if outermost:
+                    self._reload_if_changed()
+                yield self
+            finally:
+                self._depth -= 1
+                if outermost:
+                    try:
+                        if self._dirty:
+                            self._save()
+                    finally:
+                        _unlock_file(self._lock_handle)
+                        self._lock_handle.close()
+                        self._lock_handle = None
+
+    def _saved_version(self):
+        """Identifies the last save: the ids.npy file (replaced on growth or rebuild) and the
+        counter every save bumps"""
+        try:
+            stat = os.stat(self._path("ids.npy"))
+        except FileNotFoundError:
+            return None
+        try:
+            with open(self._path("version"), "rb") as f:
+                counter = int.from_bytes(f.read(), "little")
+        except FileNotFoundError:
+            counter = 0
+        return (stat.st_ino, counter)
+
+    def _reload_if_changed(self):
+        version = self._saved_version()
+        if version != self._version:
+            self._load()
+            self._version = version
+
+    def _load(self):
+        if os.path.exists(self._path("ids.npy")):
+            # Mapped, not read: a save then writes back only the pages add() and remove() touched
+            self.ids = np.lib.format.open_memmap(self._path("ids.npy"), mode="r+")
+            self.df = np.lib.format.open_memmap(self._path("df.npy"), mode="r+")
+        else:
+            self.ids = np.full(INITIAL_CAPACITY, -1, dtype=np.int64)
+            self.df = np.zeros(DIM, dtype=np.float64)
+        self._open_matrix(len(self.ids))
+        self.rows = {int(item_id): row for row, item_id in enumerate(self.ids) if item_id >= 0}
+        self.free_rows = [row for row, item_id in enumerate(self.ids) if item_id < 0][::-1]
+
+    def _open_matrix(self, capacity):
+        # Always reopen: the vectors file may have been replaced by a rebuild in another process
+        self._close_matrix()
+        path = self._path("vectors")
+        with open(path, "ab") as f:
+            f.truncate(capacity * DIM * 4)
+        self.matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, DIM))
+
+    def _close_matrix(self):
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+    def _grow(self):
+        old_capacity = len(self.ids)
+        new_capacity = old_capacity * 2
+        self._open_matrix(new_capacity)
+        self.ids = np.concatenate([self.ids, np.full(new_capacity - old_capacity, -1, dtype=np.int64)])
+        self.free_rows = list(range(new_capacity - 1, old_capacity - 1, -1)) + self.free_rows
+
+    def _save(self):
+        self.matrix.flush()
+        if isinstance(self.ids, np.memmap):
+            self.df.flush()
+            self.ids.flush()
+        else:
+            # First save or after _grow(): write whole files, then map them for later saves
+            _save_array(self._path("df.npy"), self.df)
+            _save_array(self._path("ids.npy"), self.ids)
+            self.ids = np.lib.format.open_memmap(self._path("ids.npy"), mode="r+")
+            self.df = np.lib.format.open_memmap(self._path("df.npy"), mode="r+")
+        # Bumped last: the counter is what tells other processes to reload
+        counter = (self._version[1] if self._version else 0) + 1
+        with open(self._path("version"), "wb") as f:
+            f.write(counter.to_bytes(8, "little"))
+        self._version = self._saved_version()
+        self._dirty = False
+
+    def __len__(self):
+        with self.locked(shared=True):
+            return len(self.rows)
+
+    def indexed_ids(self):
+        """Sorted ids of every indexed document"""
+        with self.locked(shared=True):
+            return np.sort(self.ids[self.ids >= 0])
+
+    def _remove_row(self, item_id):
+        row = self.rows.pop(item_id, None)
+        if row is not None:
+            self.df -= self.matrix[row] > 0
+            self.matrix[row] = 0
+            self.ids[row] = -1
+            self.free_rows.append(row)
+            self._dirty = True
+
+    def add_many(self, items):
+        """Index (id, text) pairs, replacing any earlier vector stored under the same id"""
+        with self.locked():
+            for item_id, text in items:
+                item_id = int(item_id)
+                self._remove_row(item_id)
+                if not self.free_rows:
+                    self._grow()
+                row = self.free_rows.pop()
+                vector = term_vector(text)
+                self.matrix[row] = vector
+                self.ids[row] = item_id
+                self.rows[item_id] = row
+                self.df += vector > 0
+                self._dirty = True
+
+    def add(self, item_id, text):
+        self.add_many([(item_id, text)])
+
+    def remove(self, item_id):
+        with self.locked():
+            self._remove_row(int(item_id))
+
+    def clear(self):
+        with self.locked():
+            self.matrix[:] = 0
+            self.ids[:] = -1
+            self.df[:] = 0
+            self.rows = {}
+            self.free_rows = list(range(len(self.ids) - 1, -1, -1))
+            self._dirty = True
+
+    def replace_with(self, other):
+        """Swap in the files of another index, e.g. one rebuilt under a temporary name"""
+        with self.locked(), other.locked():
+            if other._dirty:
+                other._save()
+            other._close_matrix()
+            self._close_matrix()
+            for suffix in ("vectors", "df.npy", "ids.npy"):
+                os.replace(other._path(suffix), self._path(suffix))
+            other._version = ()
+            self._version = ()
+            self._reload_if_changed()
+
+    def idf(self):
+        """Smoothed inverse document frequency per hash bucket"""
+        return np.log((1.0 + len(self.rows)) / (1.0 + self.df)) + 1.0
+
+    def query_vectors(self, texts):
+        """IDF-weighted, normalised query vectors for a batch of texts"""
+        idf = self.idf().astype(np.float32)
+        queries = np.stack([term_vector(text) for text in texts]) * idf
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return queries / norms
+
+    def search_many(self, texts, k=50, exclude=None):
+        """Top-k (id, score) lists for each query text, best first"""
+        with self.locked(shared=True):
+            if not self.rows or not texts:
+                return [[] for _ in texts]
+            queries = self.query_vectors(texts)
+            used = int(np.flatnonzero(self.ids >= 0)[-1]) + 1
+            scores = np.empty((len(texts), used), dtype=np.float32)
+            for start in range(0, used, SEARCH_CHUNK_ROWS):
+                end = min(start + SEARCH_CHUNK_ROWS, used)
+                scores[:, start:end] = queries @ self.matrix[start:end].T
+            ids = self.ids[:used].copy()
+
+        scores[:, ids < 0] = -np.inf
+        if exclude:
+            scores[:, np.isin(ids, list(exclude))] = -np.inf
+
+        results = []
+        k = min(k, used)
+        for query_scores in scores:
+            top = np.argpartition(-query_scores, k - 1)[:k] if k < used else np.arange(used)
+            top = top[np.argsort(-query_scores[top])]
+            results.append([(int(ids[row]), float(query_scores[row])) for row in top
+                            if np.isfinite(query_scores[row])])
+        return results
+
+    def search(self, text, k=50, exclude=None):
+        return self.search_many([text], k, exclude)[0]
+
+# Indexes shared by every Streamlit session in this process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(name):
+    """Open (or create) a named index in INDEX_DIR once per process"""
+    with _indexes_lock:
+        if (INDEX_DIR, name) not in _indexes:
+            _indexes[INDEX_DIR, name] = VectorIndex(name, INDEX_DIR)
+        return _indexes[INDEX_DIR, name]
+
+def index_dir_for(db_path):
+    """Where a database file's indexes live: vector_store/ for the portal's, beside the file for any other"""
+    from database import DB_PATH
+
+    if os.path.abspath(db_path) == os.path.abspath(DB_PATH):
+        return PORTAL_INDEX_DIR
+    return f"{os.path.splitext(db_path)[0]}.vector_store"
+
+def job_text(title, description, requirements):
+    """The text a job is indexed and matched by"""
+    return f"{title or ''}\n{description or ''}\n{requirements or ''}"
+
+def index_resume(application_id, resume):
+    get_index("resumes").add(application_id, resume)
+
+def index_job(job_id, title, description, requirements):
+    get_index("jobs").add(job_id, job_text(title, description, requirements))
+
+def search_resumes(text, k=50, exclude=None):
+    """Application ids whose resumes are most similar to the text, with cosine scores"""
+    return get_index("resumes").search(text, k, exclude)
+
+def search_jobs(text, k=50, exclude=None):
+    """Job ids most similar to the text, with cosine scores"""
+    return get_index("jobs").search(text, k, exclude)
+
+# Each index: its rows after a given id, the ids it should hold, and the text of a row
+INDEX_SOURCES = {
+    "resumes": ("SELECT id, resume FROM applications WHERE id > ? ORDER BY id",
+                "SELECT id FROM applications /* full-scan: index consistency check */ ORDER BY id",
+                lambda row: row[1]),
+    "jobs": ("SELECT id, title, description, requirements FROM jobs WHERE id > ? ORDER BY id",
+             "SELECT id FROM jobs /* full-scan: index consistency check */ ORDER BY id",
+             lambda row: job_text(*row[1:])),
+}
+
+def _rebuild_index(name, batch_size):
+    """Build a fresh copy of one index aside, then swap it in.
+
+    Searches keep using the old vectors until the swap. Rows added while the copy was being
+    built are indexed just before the swap, under the live index's lock.
+    """
+    from database import get_connection
+
+    rows_sql, _, text = INDEX_SOURCES[name]
+    index = get_index(name)
+    staging = VectorIndex(name, os.path.join(index.directory, "rebuild"))
+    last_id = 0
+    with staging.locked():
+        staging.clear()
+        with get_connection() as conn:
+            c = conn.execute(rows_sql, (last_id,))
+            while True:
+                batch = c.fetchmany(batch_size)
+                if not batch:
+                    break
+                staging.add_many((row[0], text(row)) for row in batch)
+                last_id = batch[-1][0]
+
+        with index.locked():
+            with get_connection() as conn:
+                recent = conn.execute(rows_sql, (last_id,)).fetchall()
+            staging.add_many((row[0], text(row)) for row in recent)
+            index.replace_with(staging)
+
+def rebuild_indexes(batch_size=5000):
+    """Re-index every stored resume and job from the database"""
+    for name in INDEX_SOURCES:
+        _rebuild_index(name, batch_size)
+
+def _index_in_step(name):
+    """Whether an index holds exactly the ids of the rows it mirrors"""
+    from database import get_connection
+
+    _, ids_sql, _ = INDEX_SOURCES[name]
+    with get_connection() as conn:
+        stored = np.fromiter((row[0] for row in conn.execute(ids_sql)), dtype=np.int64)
+    return np.array_equal(stored, get_index(name).indexed_ids())
+
+def _ensure_indexes(batch_size):
+    try:
+        for name in INDEX_SOURCES:
+            if not _index_in_step(name):
+                _rebuild_index(name, batch_size)
+    except Exception:
+        logger.exception("Rebuilding the similarity index failed")
+
+# The running check-and-rebuild thread, one per process
+_rebuild_thread = None
+
+def ensure_indexes(batch_size=5000):
+    """Rebuild, in a background thread, any index that is missing rows or holds rows the database doesn't.
+
+    Searches use the current vectors until a rebuilt index is swapped in. Returns the thread.
+    """
+    global _rebuild_thread
+    with _indexes_lock:
+        if _rebuild_thread is None or not _rebuild_thread.is_alive():
+            _rebuild_thread = threading.Thread(target=_ensure_indexes, args=(batch_size,),
+                                               name="vector-index-rebuild", daemon=True)
+            _rebuild_thread.start()
+        return _rebuild_thread
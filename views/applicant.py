@@ -1,10 +1,11 @@
+import sys
 import streamlit as st
 import pandas as pd
 import altair as alt
-import sqlite3
-import random
-from utils import display_match_score, display_application_status
-from database import get_jobs, search_jobs, get_applications_by_user
+from utils import display_match_score, display_application_status, is_scoring_pending
+from database import browse_jobs, get_job_facets, get_applications_by_user_page, get_application_status_counts_by_user
+from ui_components import start_pagination, page_navigation, refresh_when_scored, retry_scoring_button
+from metrics import instrument_module
 
 def browse_jobs_view():
     st.markdown("## Available Jobs")
@@ -12,127 +13,98 @@ def browse_jobs_view():
     # Search box
     search_query = st.text_input("Search jobs by title, description, or requirements", placeholder="e.g., Python Developer, Marketing, Remote")
     
-    # Get jobs
-    if search_query:
-        jobs = search_jobs(search_query)
-        if jobs:
-            st.write(f"Found {len(jobs)} jobs matching '{search_query}'")
-        else:
-            st.info(f"No jobs found matching '{search_query}'")
-    else:
-        jobs = get_jobs()
+    # Locations and job types for the filters
+    facets = get_job_facets()
+    
+    # Filter options
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        location_filter = st.selectbox("Location", ["All Locations"] + facets["locations"])
+    
+    with col2:
+        type_filter = st.selectbox("Job Type", ["All Types"] + facets["job_types"])
+    
+    with col3:
+        # Sort options
+        sort_options = {
+            "Newest First": "newest",
+            "Salary (High to Low)": "salary_high",
+            "Salary (Low to High)": "salary_low"
+        }
+        if search_query:
+            sort_options = {"Best Match": "relevance", **sort_options}
+        sort_option = st.selectbox("Sort By", list(sort_options))
+    
+    location = None if location_filter == "All Locations" else location_filter
+    job_type = None if type_filter == "All Types" else type_filter
+    sort = sort_options[sort_option]
+    
+    # Get one page of jobs with the filters and sorting applied in the database
+    page_size, cursor = start_pagination("browse_jobs", filters=(search_query, location, job_type, sort))
+    jobs, next_cursor = browse_jobs(search_query, location, job_type, sort, page_size, cursor)
     
     # Display jobs
     if not jobs:
-        st.info("No jobs available at the moment. Please check back later.")
+        if search_query:
+            st.info(f"No jobs found matching '{search_query}'")
+        elif location or job_type:
+            st.info("No jobs match the selected filters.")
+        else:
+            st.info("No jobs available at the moment. Please check back later.")
     else:
-        # Filter options
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            # Get unique locations
-            conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-            c = conn.cursor()
-            c.execute("SELECT DISTINCT location FROM jobs WHERE location != ''")
-            locations = [loc[0] for loc in c.fetchall()]
-            location_filter = st.selectbox("Location", ["All Locations"] + locations)
-        
-        with col2:
-            # Get unique job types
-            c.execute("SELECT DISTINCT job_type FROM jobs WHERE job_type != ''")
-            job_types = [jt[0] for jt in c.fetchall()]
-            type_filter = st.selectbox("Job Type", ["All Types"] + job_types)
-        
-        with col3:
-            # Sort options
-            sort_option = st.selectbox("Sort By", ["Newest First", "Salary (High to Low)", "Salary (Low to High)"])
-        
-        # Apply filters
-        filtered_jobs = []
-        for job in jobs:
-            include = True
-            
-            # Apply location filter
-            if location_filter != "All Locations" and job[6] != location_filter:
-                include = False
-                
-            # Apply job type filter
-            if type_filter != "All Types" and job[7] != type_filter:
-                include = False
-                
-            if include:
-                filtered_jobs.append(job)
+        if search_query:
+            st.write(f"Showing {len(jobs)} job(s) matching '{search_query}'")
+        else:
+            st.write(f"Showing {len(jobs)} job(s)")
         
-        # Apply sorting
-        if sort_option == "Newest First":
-            # Already sorted by created_at DESC
-            pass
-        elif sort_option == "Salary (High to Low)" or sort_option == "Salary (Low to High)":
-            # This is a simplified implementation - in a real app, you'd parse salary ranges properly
-            # Sort by the first number found in the salary range
-            def extract_salary(job):
-                salary = job[5] or ""
-                # Extract first number found
-                import re
-                numbers = re.findall(r'\d+', salary)
-                if numbers:
-                    return int(numbers[0])
-                return 0
-                
-            filtered_jobs.sort(key=extract_salary, reverse=(sort_option == "Salary (High to Low)"))
+        # Display jobs in a grid
+        col1, col2 = st.columns(2)
         
-        # Display results
-        if not filtered_jobs:
-            st.info("No jobs match the selected filters.")
-        else:
-            st.write(f"Showing {len(filtered_jobs)} job(s)")
-            
-            # Display jobs in a grid
-            col1, col2 = st.columns(2)
-            
-            for i, job in enumerate(filtered_jobs):
-                with (col1 if i % 2 == 0 else col2):
-                    with st.container():
-                        st.markdown('<div class="card">', unsafe_allow_html=True)
-                        st.markdown(f"### {job[1]}")
-                        st.markdown(f"**Posted by:** {job[3]}")
-                        
-                        st.markdown(f"**Location:** {job[6] or 'Not specified'}")
-                        st.markdown(f"**Type:** {job[7] or 'Not specified'}")
-                        st.markdown(f"**Salary:** {job[5] or 'Not specified'}")
-                        
-                        # Show a preview of the description
+        for i, job in enumerate(jobs):
+            with (col1 if i % 2 == 0 else col2):
+                with st.container():
+                    st.markdown('<div class="card">', unsafe_allow_html=True)
+                    st.markdown(f"### {job[1]}")
+                    st.markdown(f"**Posted by:** {job[3]}")
+                    
+                    st.markdown(f"**Location:** {job[6] or 'Not specified'}")
+                    st.markdown(f"**Type:** {job[7] or 'Not specified'}")
+                    st.markdown(f"**Salary:** {job[5] or 'Not specified'}")
+                    
+                    # Show the matching text for searches, otherwise a preview of the description
+                    if job[9]:
+                        st.markdown("**Matched:**")
+                        st.markdown(job[9])
+                    else:
                         st.markdown("**Description:**")
                         preview = job[2][:150] + "..." if len(job[2]) > 150 else job[2]
                         st.write(preview)
-                        
-                        # View full job and apply buttons
-                        col_a, col_b = st.columns(2)
-                        with col_a:
-                            if st.button("View Details", key=f"view_{job[0]}"):
-                                st.session_state.view_job = job[0]
-                                st.rerun()
-                        with col_b:
-                            if st.button("Quick Apply", key=f"apply_{job[0]}"):
-                                st.session_state.selected_job = job[0]
-                                st.rerun()
-                        st.markdown('</div>', unsafe_allow_html=True)
+                    
+                    # View full job and apply buttons
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        if st.button("View Details", key=f"view_{job[0]}"):
+                            st.session_state.view_job = job[0]
+                            st.rerun()
+                    with col_b:
+                        if st.button("Quick Apply", key=f"apply_{job[0]}"):
+                            st.session_state.selected_job = job[0]
+                            st.rerun()
+                    st.markdown('</div>', unsafe_allow_html=True)
+    
+    page_navigation("browse_jobs", next_cursor)
 
 def my_applications_view():
     st.markdown("## My Applications")
     
-    applications = get_applications_by_user(st.session_state.user)
+    status_counts = get_application_status_counts_by_user(st.session_state.user)
+    total_applications = sum(status_counts.values())
     
-    if not applications:
+    if not total_applications:
         st.info("You haven't applied to any jobs yet. Browse available jobs to start applying.")
         return
     
-    st.write(f"You have applied to {len(applications)} job(s)")
-    
-    # Group by status for a dashboard view
-    status_counts = {}
-    for app in applications:
-        status = app[6]
-        status_counts[status] = status_counts.get(status, 0) + 1
+    st.write(f"You have applied to {total_applications} job(s)")
     
     # Create a horizontal bar chart for statuses
     status_data = pd.DataFrame({
@@ -159,7 +131,9 @@ def my_applications_view():
     
     # ---- All Applications Tab ----
     with status_tabs[0]:
-        display_apps = applications
+        page_size, cursor = start_pagination("my_apps_all")
+        display_apps, next_cursor = get_applications_by_user_page(st.session_state.user, page_size, cursor)
+        refresh_when_scored([app[0] for app in display_apps if is_scoring_pending(app[8])])
         if not display_apps:
             st.info("No applications in this category.")
         else:
@@ -173,27 +147,39 @@ def my_applications_view():
                             st.session_state.view_job = app[7]
                             st.rerun()
                     with col2:
-                        st.markdown(f"**Match Score:** {display_match_score(app[3])}", unsafe_allow_html=True)
+                        st.markdown(f"**Match Score:** {display_match_score(app[3], app[8])}", unsafe_allow_html=True)
                         st.markdown("**Match Analysis:**")
                         st.write(app[4])
+                        if app[8] == "failed":
+                            retry_scoring_button(app[0], key=f"retry_all_{app[0]}")
+        page_navigation("my_apps_all", next_cursor)
     
     # ---- Status-Specific Tabs ----
     for i, status in enumerate(["Pending", "Interview", "Accepted", "Rejected"]):
         with status_tabs[i + 1]:
-            display_apps = [app for app in applications if app[6] == status]
-            if not display_apps:
+            if not status_counts.get(status):
                 st.info(f"No applications with status: {status}")
-            else:
-                for idx, app in enumerate(display_apps):
-                    with st.expander(f"{app[1]} - {app[2]}"):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown(f"**Applied:** {app[5].split()[0] if app[5] else 'N/A'}")
-                            if st.button("View Job Details", key=f"view_job_status_{status}_{app[7]}_{idx}"):
-                                st.session_state.view_job = app[7]
-                                st.rerun()
-                        with col2:
-                            st.markdown(f"**Match Score:** {display_match_score(app[3])}", unsafe_allow_html=True)
-                            st.markdown("**Match Analysis:**")
-                            st.write(app[4])
+                continue
+            
+            page_size, cursor = start_pagination(f"my_apps_{status}")
+            display_apps, next_cursor = get_applications_by_user_page(
+                st.session_state.user, page_size, cursor, status=status
+            )
+            refresh_when_scored([app[0] for app in display_apps if is_scoring_pending(app[8])])
+            for idx, app in enumerate(display_apps):
+                with st.expander(f"{app[1]} - {app[2]}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Applied:** {app[5].split()[0] if app[5] else 'N/A'}")
+                        if st.button("View Job Details", key=f"view_job_status_{status}_{app[7]}_{idx}"):
+                            st.session_state.view_job = app[7]
+                            st.rerun()
+                    with col2:
+                        st.markdown(f"**Match Score:** {display_match_score(app[3], app[8])}", unsafe_allow_html=True)
+                        st.markdown("**Match Analysis:**")
+                        st.write(app[4])
+                        if app[8] == "failed":
+                            retry_scoring_button(app[0], key=f"retry_{status}_{app[0]}")
+            page_navigation(f"my_apps_{status}", next_cursor)
 
+instrument_module(sys.modules[__name__], "view.applicant")
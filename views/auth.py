@@ -1,6 +1,8 @@
+import sys
 import streamlit as st
 import time
 from database import register_user, login_user
+from metrics import instrument_module
 
 def login_view():
     st.markdown("## Login")
@@ -60,4 +62,6 @@ def register_view():
             else:
                 st.error("⚠️ Please enter a valid email address.")
         else:
-            st.error("⚠️ All fields are required.")
\ No newline at end of file
+            st.error("⚠️ All fields are required.")
+
+instrument_module(sys.modules[__name__], "view.auth")
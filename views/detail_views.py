@@ -1,10 +1,16 @@
+import sys
 import streamlit as st
 import time
-from database import get_job_by_id, get_applications_by_job, apply_to_job
-from ai_engine import extract_resume_info, match_resume_to_job
-from utils import display_match_score, display_application_status, generate_match_gauge
+from database import (get_job_by_id, get_applications_by_job_page, get_application_status_counts_by_job, apply_to_job,
+                      get_top_candidates_for_job, get_job_skills, get_application_skills, get_skill_gaps_by_job)
+from ui_components import start_pagination, page_navigation, refresh_when_scored, retry_scoring_button
+from ai_engine import ai_engine_status
+from scoring_queue import enqueue as enqueue_scoring
+from utils import (display_match_score, format_match_score, display_application_status, generate_match_gauge, format_skill_match,
+                   is_scoring_pending)
 import pandas as pd
 import altair as alt
+from metrics import instrument_module
 
 def job_detail_view():
     """Display detailed view of a specific job"""
@@ -47,18 +53,13 @@ def job_applications_view():
     if job:
         st.markdown(f"## Applications for: {job[1]}")
         
-        applications = get_applications_by_job(job[0])
+        status_counts = get_application_status_counts_by_job(job[0])
+        total_applications = sum(status_counts.values())
         
-        if not applications:
+        if not total_applications:
             st.info("No applications for this job yet.")
         else:
-            st.write(f"Total applications: {len(applications)}")
-            
-            # Group by status
-            status_counts = {}
-            for app in applications:
-                status = app[8]
-                status_counts[status] = status_counts.get(status, 0) + 1
+            st.write(f"Total applications: {total_applications}")
             
             # Create a bar chart for statuses
             if status_counts:
@@ -83,12 +84,40 @@ def job_applications_view():
                 
                 st.altair_chart(status_chart, use_container_width=True)
             
+            # How many applicants have each skill the job asks for
+            skill_gaps = get_skill_gaps_by_job(job[0])
+            job_skills = get_job_skills(job[0])
+            if skill_gaps:
+                gap_data = pd.DataFrame(
+                    [{'Skill': skill, 'Applicants': have, 'Coverage': 'Has skill'} for skill, have, _ in skill_gaps] +
+                    [{'Skill': skill, 'Applicants': missing, 'Coverage': 'Missing'} for skill, _, missing in skill_gaps]
+                )
+                gap_chart = alt.Chart(gap_data).mark_bar().encode(
+                    x=alt.X('Applicants:Q', stack=True),
+                    y=alt.Y('Skill:N'),
+                    color=alt.Color('Coverage:N', scale=alt.Scale(
+                        domain=['Has skill', 'Missing'],
+                        range=['#4CAF50', '#F44336']
+                    )),
+                    tooltip=['Skill', 'Coverage', 'Applicants']
+                ).properties(
+                    height=min(30 * len(skill_gaps), 300)
+                )
+                
+                st.markdown("#### Skill Coverage")
+                st.altair_chart(gap_chart, use_container_width=True)
+            
             # Display applications grouped by status
             status_tabs = st.tabs(["All Applications", "Pending", "Interview", "Accepted", "Rejected"])
             
             with status_tabs[0]:
+                page_key = f"job_apps_{job[0]}_all"
+                page_size, cursor = start_pagination(page_key)
+                applications, next_cursor = get_applications_by_job_page(job[0], page_size, cursor)
+                app_skills = get_application_skills([app[0] for app in applications])
+                refresh_when_scored([app[0] for app in applications if is_scoring_pending(app[9])])
                 for app in applications:
-                    with st.expander(f"{app[1]} - Match: {app[5]:.1f}%"):
+                    with st.expander(f"{app[1]} - Match: {format_match_score(app[5], app[9])}"):
                         col1, col2 = st.columns(2)
                         
                         with col1:
@@ -97,14 +126,17 @@ def job_applications_view():
                             
                             st.markdown("**Skills:**")
                             st.write(app[3])
+                            st.caption(format_skill_match(job_skills, app_skills[app[0]]))
                             
                             st.markdown("**Experience:**")
                             st.write(app[4])
                         
                         with col2:
-                            st.markdown(f"**Match Score:** {display_match_score(app[5])}", unsafe_allow_html=True)
+                            st.markdown(f"**Match Score:** {display_match_score(app[5], app[9])}", unsafe_allow_html=True)
                             st.markdown("**Match Analysis:**")
                             st.write(app[6])
+                            if app[9] == "failed":
+                                retry_scoring_button(app[0], key=f"retry_job_app_{app[0]}")
                             
                             # Update status
                             from database import update_job_status
@@ -121,16 +153,23 @@ def job_applications_view():
                                     st.success(f"Status updated to: {new_status}")
                                     time.sleep(1)
                                     st.rerun()
+                page_navigation(page_key, next_cursor)
             
             # Filter applications by status for the remaining tabs
             for i, status in enumerate(["Pending", "Interview", "Accepted", "Rejected"]):
                 with status_tabs[i+1]:
-                    display_apps = [app for app in applications if app[8] == status]
-                    if not display_apps:
+                    if not status_counts.get(status):
                         st.info(f"No applications with status: {status}")
                     else:
+                        page_key = f"job_apps_{job[0]}_{status}"
+                        page_size, cursor = start_pagination(page_key)
+                        display_apps, next_cursor = get_applications_by_job_page(
+                            job[0], page_size, cursor, status=status
+                        )
+                        app_skills = get_application_skills([app[0] for app in display_apps])
+                        refresh_when_scored([app[0] for app in display_apps if is_scoring_pending(app[9])])
                         for app in display_apps:
-                            with st.expander(f"{app[1]} - Match: {app[5]:.1f}%"):
+                            with st.expander(f"{app[1]} - Match: {format_match_score(app[5], app[9])}"):
                                 # Similar content as above, but for filtered status
                                 col1, col2 = st.columns(2)
                                 
@@ -139,14 +178,17 @@ def job_applications_view():
                                     
                                     st.markdown("**Skills:**")
                                     st.write(app[3])
+                                    st.caption(format_skill_match(job_skills, app_skills[app[0]]))
                                     
                                     st.markdown("**Experience:**")
                                     st.write(app[4])
                                 
                                 with col2:
-                                    st.markdown(f"**Match Score:** {display_match_score(app[5])}", unsafe_allow_html=True)
+                                    st.markdown(f"**Match Score:** {display_match_score(app[5], app[9])}", unsafe_allow_html=True)
                                     st.markdown("**Match Analysis:**")
                                     st.write(app[6])
+                                    if app[9] == "failed":
+                                        retry_scoring_button(app[0], key=f"retry_job_app_{app[0]}_{i}")
                                     
                                     # Update status
                                     from database import update_job_status
@@ -163,6 +205,25 @@ def job_applications_view():
                                             st.success(f"Status updated to: {new_status}")
                                             time.sleep(1)
                                             st.rerun()
+                        page_navigation(page_key, next_cursor)
+
+        # Candidates from every stored resume, ranked by text similarity without running the model
+        with st.expander("🔎 Talent Pool: similar candidates from all stored resumes"):
+            top_n = st.select_slider("Candidates to show", [10, 25, 50, 100], value=50, key=f"talent_pool_{job[0]}")
+            candidates = get_top_candidates_for_job(job[0], top_n)
+            if not candidates:
+                st.info("No other stored resumes to compare against yet.")
+            else:
+                talent_df = pd.DataFrame([
+                    {
+                        "Candidate": candidate[1],
+                        "Similarity": round(candidate[4] * 100, 1),
+                        "Applied For": candidate[2],
+                        "Skills": candidate[3]
+                    }
+                    for candidate in candidates
+                ])
+                st.dataframe(talent_df, use_container_width=True, hide_index=True)
 
 def application_form_view():
     """Display the application form for a selected job"""
@@ -181,123 +242,31 @@ def application_form_view():
         
         st.subheader("Paste Your Resume Below")
         resume_text = st.text_area("Resume", height=300)
+        ai_engine_status()
         
-        if st.button("Analyze Resume and Apply", type="primary"):
+        if st.button("Submit Application", type="primary"):
             if resume_text:
-                with st.spinner("Analyzing your resume..."):
-                    try:
-                        # Add artificial delay to show processing
-                        import time
-                        time.sleep(2)  # 2 second delay
-                        
-                        # Generate a random match score for testing
-                        import random
-                        match_score = random.uniform(50.0, 95.0)
-                        
-                        # Initialize empty extracted dictionary instead of calling extract_resume_info
-                        extracted = {}
-                        
-                        # Extract skills directly from resume text
-                        # Simple extraction of potential skills based on resume sections
-                        resume_parts = resume_text.lower().split('\n')
-                        potential_skills = []
-                        
-                        # Look for skills section and extract items
-                        in_skills_section = False
-                        for line in resume_parts:
-                            if "skills" in line.lower() or "technologies" in line.lower():
-                                in_skills_section = True
-                                continue
-                            
-                            if in_skills_section and line.strip():
-                                # Extract comma or bullet separated items
-                                if ',' in line:
-                                    skills_items = [s.strip() for s in line.split(',')]
-                                    potential_skills.extend(skills_items)
-                                elif '•' in line or '-' in line:
-                                    skill = line.replace('•', '').replace('-', '').strip()
-                                    potential_skills.append(skill)
-                                else:
-                                    potential_skills.append(line.strip())
-                            
-                            # Exit skills section when we hit another heading
-                            if in_skills_section and line.strip() and line.strip().endswith(':'):
-                                in_skills_section = False
-                        
-                        # Add another spinner for match calculation
-                        with st.spinner("Calculating match score..."):
-                            time.sleep(1.5)  # 1.5 second delay
-                            
-                            # Convert the skills list to a string (joined by commas)
-                            skills_string = ", ".join(potential_skills[:10]) if potential_skills else "Not specified"
-                            extracted["skills"] = skills_string
-                            
-                            # Extract basic experience summary
-                            experience_summary = "Experience extracted from resume"
-                            extracted["experience"] = experience_summary
-                            
-                            # Generate random feedback
-                            feedback_options = [
-                                "Your experience aligns well with the job requirements.",
-                                "Consider highlighting more relevant skills for this position.",
-                                "Your technical skills match what the employer is looking for.",
-                                "Your resume shows strong qualifications for this role."
-                            ]
-                            match_feedback = random.choice(feedback_options)
-                            
-                            # Create a match result dictionary
-                            match_result = {
-                                "score": match_score,
-                                "feedback": match_feedback
-                            }
-                        
-                        # Save application
-                        apply_to_job(
-                            username=st.session_state.user,
-                            job_id=st.session_state.selected_job,
-                            resume=resume_text,
-                            skills=extracted["skills"],
-                            experience=extracted["experience"],
-                            match_score=match_result["score"],
-                            match_feedback=match_result["feedback"]
-                        )
-                        
-                        # Display results
-                        st.success("✅ Application submitted successfully!")
-                        
-                        # col1, col2 = st.columns(2)
-                        
-                        # with col1:
-                        #     st.subheader("Extracted Skills")
-                        #     st.write(extracted["skills"])
-                            
-                        #     st.subheader("Experience Summary")
-                        #     st.write(extracted["experience"])
-                        
-                        # with col2:
-                        #     st.subheader("Match Analysis")
-                            
-                        #     # Create a color based on the match score
-                        #     if match_result["score"] >= 80:
-                        #         color = "green"
-                        #         emoji = "🌟"
-                        #     elif match_result["score"] >= 60:
-                        #         color = "orange"
-                        #         emoji = "⭐"
-                        #     else:
-                        #         color = "red" 
-                        #         emoji = "⚠️"
-                                
-                            # st.markdown(f"<h3 style='color:{color}'>{emoji} Match Score: {match_result['score']:.1f}%</h3>", unsafe_allow_html=True)
-                            # st.write(match_result["feedback"])
-                        
-                        # Option to go back to job list
-                        if st.button("Back to Job Listings"):
-                            st.session_state.selected_job = None
-                            st.rerun()
-                        
-                    except Exception as e:
-                        st.error(f"⚠️ Error processing resume: {str(e)}")
-                        st.info("Your application was not submitted. Please try again.")
+                try:
+                    # Saved straight away; the AI analysis runs in the background
+                    application_id = apply_to_job(
+                        username=st.session_state.user,
+                        job_id=st.session_state.selected_job,
+                        resume=resume_text
+                    )
+                    enqueue_scoring(application_id)
+                    
+                    st.success("✅ Application submitted successfully!")
+                    st.info("Your resume is being analyzed. The match score will appear under 'My Applications' shortly.")
+                    
+                    # Option to go back to job list
+                    if st.button("Back to Job Listings"):
+                        st.session_state.selected_job = None
+                        st.rerun()
+                    
+                except Exception as e:
+                    st.error(f"⚠️ Error submitting application: {str(e)}")
+                    st.info("Your application was not submitted. Please try again.")
             else:
                 st.error("⚠️ Please paste your resume to apply")
+
+instrument_module(sys.modules[__name__], "view.detail_views")
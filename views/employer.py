@@ -1,10 +1,20 @@
+import sys
 import streamlit as st
 import pandas as pd
 import altair as alt
 import time
-from database import post_job, get_job_by_id, update_job_status, get_applications_by_job
-from ai_engine import process_bulk_resumes
-from utils import display_match_score, display_application_status
+from database import (get_connection, get_jobs_by_employer, post_job, get_job_by_id, update_job_status,
+                      get_applications_by_employer_page, get_bulk_run, get_bulk_runs_by_employer,
+                      get_bulk_run_results, get_bulk_run_failures)
+from ai_engine import DEFAULT_BULK_WORKERS, MULTI_CALL, SINGLE_PASS, ai_engine_status
+from bulk_runs import start_bulk_run, resume_bulk_run, is_active as is_bulk_run_active
+from utils import display_match_score, format_match_score, display_application_status, is_scoring_pending
+from ui_components import start_pagination, page_navigation, refresh_when_scored, retry_scoring_button
+from metrics import instrument_module
+
+# Live ranking while a bulk analysis runs: refresh interval and how many leaders to show
+BULK_REDRAW_SECONDS = 1
+BULK_LIVE_TOP_N = 25
 
 def post_job_view():
     st.markdown("## Post a New Job")
@@ -47,15 +57,8 @@ def post_job_view():
 def job_listings_view():
     st.markdown("## My Job Listings")
     
-    # Get jobs posted by this employer
-    import sqlite3
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("""SELECT id, title, description, posted_by, requirements, 
-                salary_range, location, job_type, created_at FROM jobs 
-                WHERE posted_by=? ORDER BY created_at DESC""", 
-              (st.session_state.user,))
-    employer_jobs = c.fetchall()
+    # Get jobs posted by this employer, with their application statistics
+    employer_jobs = get_jobs_by_employer(st.session_state.user)
     
     if not employer_jobs:
         st.info("You haven't posted any jobs yet. Go to 'Post Job' to create your first listing.")
@@ -86,11 +89,7 @@ def job_listings_view():
                 
                 with col2:
                     # Application statistics
-                    c.execute("SELECT COUNT(*) FROM applications WHERE job_id = ?", (job[0],))
-                    app_count = c.fetchone()[0]
-                    
-                    c.execute("SELECT AVG(match_score) FROM applications WHERE job_id = ?", (job[0],))
-                    avg_score = c.fetchone()[0] or 0
+                    app_count, avg_score = job[9], job[10]
                     
                     st.markdown('<div class="metric-container">', unsafe_allow_html=True)
                     st.markdown(f'<div class="metric-value">{app_count}</div>', unsafe_allow_html=True)
@@ -111,11 +110,10 @@ def applications_view():
     st.markdown("## Applications")
     
     # Get jobs posted by this employer
-    import sqlite3
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT id, title FROM jobs WHERE posted_by=?", (st.session_state.user,))
-    employer_jobs = c.fetchall()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, title FROM jobs WHERE posted_by=?", (st.session_state.user,))
+        employer_jobs = c.fetchall()
     
     if not employer_jobs:
         st.info("You haven't posted any jobs yet. Go to 'Post Job' to create your first listing.")
@@ -133,56 +131,23 @@ def applications_view():
         )
         
         # Get applications based on filters
-        if job_filter == "All Jobs":
-            if status_filter == "All Statuses":
-                c.execute("""
-                    SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score, 
-                           a.match_feedback, a.application_date, a.status
-                    FROM applications a
-                    JOIN jobs j ON a.job_id = j.id
-                    WHERE j.posted_by = ?
-                    ORDER BY a.match_score DESC
-                """, (st.session_state.user,))
-            else:
-                c.execute("""
-                    SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score, 
-                           a.match_feedback, a.application_date, a.status
-                    FROM applications a
-                    JOIN jobs j ON a.job_id = j.id
-                    WHERE j.posted_by = ? AND a.status = ?
-                    ORDER BY a.match_score DESC
-                """, (st.session_state.user, status_filter))
-        else:
-            job_id = int(job_filter.split(" - ")[0])
-            if status_filter == "All Statuses":
-                c.execute("""
-                    SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score, 
-                           a.match_feedback, a.application_date, a.status
-                    FROM applications a
-                    JOIN jobs j ON a.job_id = j.id
-                    WHERE j.posted_by = ? AND a.job_id = ?
-                    ORDER BY a.match_score DESC
-                """, (st.session_state.user, job_id))
-            else:
-                c.execute("""
-                    SELECT a.id, a.username, j.title, j.id, a.extracted_skills, a.extracted_exp, a.match_score, 
-                           a.match_feedback, a.application_date, a.status
-                    FROM applications a
-                    JOIN jobs j ON a.job_id = j.id
-                    WHERE j.posted_by = ? AND a.job_id = ? AND a.status = ?
-                    ORDER BY a.match_score DESC
-                """, (st.session_state.user, job_id, status_filter))
+        job_id = None if job_filter == "All Jobs" else int(job_filter.split(" - ")[0])
+        status = None if status_filter == "All Statuses" else status_filter
         
-        applications = c.fetchall()
+        page_size, cursor = start_pagination("employer_apps", filters=(job_id, status))
+        applications, next_cursor = get_applications_by_employer_page(
+            st.session_state.user, page_size, cursor, job_id=job_id, status=status
+        )
+        refresh_when_scored([app[0] for app in applications if is_scoring_pending(app[10])])
         
         if not applications:
             st.info("No applications found for the selected filters.")
         else:
-            st.write(f"Found {len(applications)} application(s)")
+            st.write(f"Showing {len(applications)} application(s)")
             
             # Display applications
             for app in applications:
-                with st.expander(f"📄 {app[1]} - {app[2]} - Match: {app[6]:.1f}%"):
+                with st.expander(f"📄 {app[1]} - {app[2]} - Match: {format_match_score(app[6], app[10])}"):
                     col1, col2 = st.columns(2)
                     
                     with col1:
@@ -201,7 +166,13 @@ def applications_view():
                         st.markdown("**Match Analysis:**")
                         
                         # Create a color based on the match score
-                        if app[6] >= 80:
+                        if app[6] is None and app[10] == "failed":
+                            score_color = "gray"
+                            recommendation = "analysis failed"
+                        elif app[6] is None:
+                            score_color = "gray"
+                            recommendation = "analysis in progress"
+                        elif app[6] >= 80:
                             score_color = "green"
                             recommendation = "Strong match"
                         elif app[6] >= 60:
@@ -211,8 +182,10 @@ def applications_view():
                             score_color = "red"
                             recommendation = "Low match"
                         
-                        st.markdown(f'<p style="font-size:1.2rem; font-weight:bold; color:{score_color};">Match Score: {app[6]:.1f}% ({recommendation})</p>', unsafe_allow_html=True)
+                        st.markdown(f'<p style="font-size:1.2rem; font-weight:bold; color:{score_color};">Match Score: {format_match_score(app[6], app[10])} ({recommendation})</p>', unsafe_allow_html=True)
                         st.write(app[7])
+                        if app[10] == "failed":
+                            retry_scoring_button(app[0], key=f"retry_{app[0]}")
                         
                         # Update status
                         new_status = st.selectbox(
@@ -228,16 +201,17 @@ def applications_view():
                                 st.success(f"Status updated to: {new_status}")
                                 time.sleep(1)
                                 st.rerun()
+        
+        page_navigation("employer_apps", next_cursor)
 
 def bulk_analysis_view():
     st.markdown("## Bulk Resume Analysis")
     
     # Get jobs posted by this employer
-    import sqlite3
-    conn = sqlite3.connect("hr_match_portal.db", check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT id, title FROM jobs WHERE posted_by=?", (st.session_state.user,))
-    employer_jobs = c.fetchall()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, title FROM jobs WHERE posted_by=?", (st.session_state.user,))
+        employer_jobs = c.fetchall()
     
     if not employer_jobs:
         st.info("You haven't posted any jobs yet. Go to 'Post Job' to create your first listing.")
@@ -261,103 +235,174 @@ def bulk_analysis_view():
         st.markdown('<div class="help-text">Upload multiple resume text files (.txt) for batch analysis. Our AI will analyze each resume and match it against the selected job requirements.</div>', unsafe_allow_html=True)
         
         uploaded_files = st.file_uploader("Upload resumes", type=["txt"], accept_multiple_files=True)
+        ai_engine_status()
         
         if uploaded_files:
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(f"📄 {len(uploaded_files)} files uploaded")
+                workers = st.slider("Resumes analyzed in parallel", 1, max(DEFAULT_BULK_WORKERS, 1) * 2, DEFAULT_BULK_WORKERS,
+                                    help="Only used when batched inference is unavailable; batches are sized automatically.")
+                analysis_modes = {
+                    "Detailed (separate skills, experience and match calls)": MULTI_CALL,
+                    "Fast (one combined call per resume)": SINGLE_PASS
+                }
+                analysis_mode = st.radio("Analysis mode", list(analysis_modes))
             with col2:
                 analyze_button = st.button("Analyze Resumes", type="primary")
             
             if analyze_button:
-                with st.spinner("Analyzing resumes... This may take a moment"):
-                    # Process the batch of resumes
-                    results = process_bulk_resumes(uploaded_files, job_id, job[2], job[4])
-                    
-                    if "error" in results:
-                        st.error(results["error"])
-                    else:
-                        # Store results in session state for persistence
-                        st.session_state.bulk_results = results
+                # The run is stored and analyzed in the background, so it survives refreshes and restarts
+                st.session_state.bulk_run_id = start_bulk_run(
+                    st.session_state.user, job_id, uploaded_files, analysis_modes[analysis_mode], max_workers=workers
+                )
+        
+        # The run just started, or one picked from the history
+        if st.session_state.get("bulk_run_id"):
+            bulk_run_view(st.session_state.bulk_run_id)
+        
+        bulk_run_history_view()
+
+def bulk_run_view(run_id):
+    """Live progress of a bulk run, or its stored results once it has finished"""
+    run = get_bulk_run(run_id)
+    if not run or run[1] != st.session_state.user:
+        return
+    
+    st.markdown(f"### Run #{run[0]}: {run[3]}")
+    
+    if run[6] == "running":
+        if not is_bulk_run_active(run_id):
+            st.warning(f"This run was interrupted after {run[8] + run[9]} of {run[7]} files.")
+            if st.button("Resume Run", key=f"resume_run_{run_id}"):
+                resume_bulk_run(run_id)
+                st.rerun()
+        bulk_run_progress(run_id)
+        return
+    
+    if run[6] == "failed":
+        st.error(f"This run stopped after {run[8] + run[9]} of {run[7]} files: {run[12]}")
+        if st.button("Resume Run", key=f"resume_run_{run_id}"):
+            resume_bulk_run(run_id)
+            st.rerun()
+    
+    for filename, error in get_bulk_run_failures(run_id):
+        st.warning(f"Could not analyze {filename}: {error}")
+    
+    results = get_bulk_run_results(run_id)
+    if not results:
+        return
+    
+    # Create a visualization of the scores
+    st.markdown("### Match Score Overview")
+    chart_slot = st.empty()
+    
+    # Display summary table
+    st.markdown("### Resume Ranking")
+    table_slot = st.empty()
+    draw_bulk_ranking(results, chart_slot, table_slot)
+    
+    # Show full details in expandable sections, best match first
+    st.markdown("### Detailed Analysis")
+    for i, row in enumerate(results):
+        with st.expander(f"📄 {row['filename']} - Match Score: {row['match_score']:.1f}%"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("#### Skills")
+                st.write(row["skills"])
                 
-                # Show results if available
-                if hasattr(st.session_state, 'bulk_results'):
-                    # Convert to DataFrame for easier display
-                    df = pd.DataFrame(st.session_state.bulk_results)
-                    
-                    # Create a visualization of the scores
-                    st.markdown("### Match Score Overview")
-                    
-                    # Create a bar chart of scores
-                    chart_data = pd.DataFrame({
-                        'Resume': df['filename'],
-                        'Match Score': df['match_score']
-                    }).sort_values(by='Match Score', ascending=False)
+                st.markdown("#### Experience")
+                st.write(row["experience"])
+            
+            with col2:
+                st.markdown("#### Match Analysis")
+                st.write(row["match_feedback"])
+            
+            # Option to save this candidate to applications
+            if st.button(f"Save to Applications", key=f"save_{run_id}_{i}"):
+                try:
+                    # Generate a username from filename
+                    username = row['filename'].replace(".txt", "").replace("_", " ")
                     
-                    chart = alt.Chart(chart_data).mark_bar().encode(
-                        x=alt.X('Match Score:Q', title='Match Score (%)'),
-                        y=alt.Y('Resume:N', sort='-x', title='Resume'),
-                        color=alt.Color('Match Score:Q', scale=alt.Scale(
-                            domain=[0, 50, 100],
-                            range=['#F44336', '#FF9800', '#4CAF50']
-                        )),
-                        tooltip=['Resume', 'Match Score']
-                    ).properties(
-                        width=600,
-                        height=min(30 * len(df), 500)
+                    # Save to applications with a temporary username based on the filename
+                    from database import apply_to_job
+                    apply_to_job(
+                        username=username,
+                        job_id=run[2],
+                        resume=row["resume_text"],
+                        skills=row["skills"],
+                        experience=row["experience"],
+                        match_score=row["match_score"],
+                        match_feedback=row["match_feedback"]
                     )
-                    
-                    st.altair_chart(chart, use_container_width=True)
-                    
-                    # Display summary table
-                    st.markdown("### Resume Ranking")
-                    summary_df = df[["filename", "match_score"]].sort_values(by="match_score", ascending=False)
-                    summary_df = summary_df.rename(columns={"filename": "Resume", "match_score": "Match Score"})
-                    summary_df["Match Score"] = summary_df["Match Score"].apply(lambda x: f"{x:.1f}%")
-                    st.table(summary_df)
-                    
-                    # Show full details in expandable sections
-                    st.markdown("### Detailed Analysis")
-                    for i, row in df.iterrows():
-                        with st.expander(f"📄 {row['filename']} - Match Score: {row['match_score']:.1f}%"):
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.markdown("#### Skills")
-                                st.write(row["skills"])
-                                
-                                st.markdown("#### Experience")
-                                st.write(row["experience"])
-                            
-                            with col2:
-                                st.markdown("#### Match Analysis")
-                                st.write(row["match_feedback"])
-                            
-                            # Option to save this candidate to applications
-                            if st.button(f"Save to Applications", key=f"save_{i}"):
-                                try:
-                                    # Extract resume text if available
-                                    if "resume_text" in row:
-                                        resume_text = row["resume_text"]
-                                    else:
-                                        # Get the resume content from the uploaded file
-                                        resume_file = [f for f in uploaded_files if f.name == row['filename']][0]
-                                        resume_text = resume_file.getvalue().decode("utf-8")
-                                    
-                                    # Generate a username from filename
-                                    username = row['filename'].replace(".txt", "").replace("_", " ")
-                                    
-                                    # Save to applications with a temporary username based on the filename
-                                    from database import apply_to_job
-                                    apply_to_job(
-                                        username=username,
-                                        job_id=job_id,
-                                        resume=resume_text,
-                                        skills=row["skills"],
-                                        experience=row["experience"],
-                                        match_score=row["match_score"],
-                                        match_feedback=row["match_feedback"]
-                                    )
-                                    st.success(f"✅ Added {username} to applications!")
-                                except Exception as e:
-                                    st.error(f"Error saving application: {str(e)}")
\ No newline at end of file
+                    st.success(f"✅ Added {username} to applications!")
+                except Exception as e:
+                    st.error(f"Error saving application: {str(e)}")
+
+@st.fragment(run_every=BULK_REDRAW_SECONDS)
+def bulk_run_progress(run_id):
+    """Progress bar and live ranking for a running bulk run, redrawn from the database"""
+    run = get_bulk_run(run_id)
+    if run[6] != "running":
+        # Finished: rerun the page to show the full results
+        st.rerun()
+    
+    finished = run[8] + run[9]
+    st.progress(finished / run[7] if run[7] else 1.0)
+    st.text(f"Processed {finished} of {run[7]} files")
+    
+    st.markdown("### Live Ranking")
+    draw_bulk_ranking(get_bulk_run_results(run_id, BULK_LIVE_TOP_N), st.empty(), st.empty())
+
+def bulk_run_history_view():
+    """Earlier bulk runs, viewable without analyzing anything again"""
+    runs = get_bulk_runs_by_employer(st.session_state.user)
+    if not runs:
+        return
+    
+    with st.expander("📚 Past Runs"):
+        labels = {
+            f"#{run[0]} · {run[3]} · {run[6]} · {run[8]}/{run[7]} analyzed · {run[10].split()[0] if run[10] else ''}": run[0]
+            for run in runs
+        }
+        selected = st.selectbox("Select a run", list(labels))
+        if st.button("View Run"):
+            st.session_state.bulk_run_id = labels[selected]
+            st.rerun()
+
+def draw_bulk_ranking(results, chart_slot, table_slot, top_n=None):
+    """Draw the score chart and ranking table for bulk results into two placeholders"""
+    scored = [r for r in results if "error" not in r]
+    if not scored:
+        return
+    
+    df = pd.DataFrame(scored).sort_values(by="match_score", ascending=False)
+    if top_n:
+        df = df.head(top_n)
+    
+    # Create a bar chart of scores
+    chart_data = pd.DataFrame({
+        'Resume': df['filename'],
+        'Match Score': df['match_score']
+    })
+    
+    chart = alt.Chart(chart_data).mark_bar().encode(
+        x=alt.X('Match Score:Q', title='Match Score (%)', scale=alt.Scale(domain=[0, 100])),
+        y=alt.Y('Resume:N', sort='-x', title='Resume'),
+        color=alt.Color('Match Score:Q', scale=alt.Scale(
+            domain=[0, 50, 100],
+            range=['#F44336', '#FF9800', '#4CAF50']
+        )),
+        tooltip=['Resume', 'Match Score']
+    ).properties(
+        width=600,
+        height=min(30 * len(df), 500)
+    )
+    chart_slot.altair_chart(chart, use_container_width=True)
+    
+    summary_df = df[["filename", "match_score"]].rename(columns={"filename": "Resume", "match_score": "Match Score"})
+    summary_df["Match Score"] = summary_df["Match Score"].apply(lambda x: f"{x:.1f}%")
+    table_slot.dataframe(summary_df, use_container_width=True, hide_index=True)
+
+instrument_module(sys.modules[__name__], "view.employer")
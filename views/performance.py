@@ -0,0 +1,98 @@
+import sys
+import json
+import streamlit as st
+import pandas as pd
+import altair as alt
+import metrics
+from metrics import instrument_module
+
+# Timer name prefixes the page can be filtered by
+AREAS = {"All": "", "Database": "db.", "AI model": "model.", "Pages": "view."}
+
+# Slowest timers shown in the chart
+TOP_TIMERS = 15
+
+def performance_view():
+    st.markdown("## Performance")
+    st.caption("Timings since this server process started (or since the last reset). Percentiles are estimated "
+               "from histogram buckets, so they read as \"at most\".")
+
+    snapshot = metrics.snapshot()
+    gauges = snapshot["gauges"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("AI answer cache hit rate", _percent(gauges.get("model_cache.hit_rate")))
+    with col2:
+        st.metric("Applications waiting for scoring", gauges.get("scoring_queue.depth", 0))
+    with col3:
+        st.metric("Bulk runs in progress", gauges.get("bulk_runs.active", 0))
+    with col4:
+        st.metric("AI model", "Ready" if gauges.get("model.ready") else "Loading")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Recommendation cache hit rate", _percent(gauges.get("db.recommendation_cache.hit_rate")))
+    with col2:
+        st.metric("Filter cache hit rate", _percent(gauges.get("db.facet_cache.hit_rate")))
+    with col3:
+        st.metric("Database connections (idle / open)", f"{gauges.get('db.pool.idle', 0)} / {gauges.get('db.pool.open', 0)}")
+    with col4:
+        st.metric("Inference batch size", gauges.get("model.batch_size", "n/a"))
+
+    area = st.radio("Show", list(AREAS), horizontal=True)
+    timers = {name: timer for name, timer in snapshot["timers"].items() if name.startswith(AREAS[area])}
+
+    if not timers:
+        st.info("Nothing has been timed here yet. Use the portal for a while and come back.")
+    else:
+        df = pd.DataFrame([
+            {
+                "Name": name,
+                "Calls": timer["count"],
+                "Errors": timer["errors"],
+                "Total (s)": timer["total"],
+                "Mean (ms)": timer["mean"] * 1000,
+                "p50 (ms)": timer["p50"] * 1000,
+                "p95 (ms)": timer["p95"] * 1000,
+                "p99 (ms)": timer["p99"] * 1000,
+                "Max (ms)": timer["max"] * 1000,
+            }
+            for name, timer in timers.items()
+        ]).sort_values(by="Total (s)", ascending=False)
+
+        # Where the time goes: the timers with the most total time
+        st.markdown("### Time Spent")
+        chart = alt.Chart(df.head(TOP_TIMERS)).mark_bar().encode(
+            x=alt.X('Total (s):Q', title='Total time (s)'),
+            y=alt.Y('Name:N', sort='-x', title=None),
+            tooltip=['Name', 'Calls', alt.Tooltip('Mean (ms):Q', format='.1f'), alt.Tooltip('p95 (ms):Q', format='.1f')]
+        ).properties(
+            height=min(30 * min(len(df), TOP_TIMERS), 500)
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+        st.markdown("### All Timers")
+        st.dataframe(df.round(2), use_container_width=True, hide_index=True)
+
+    if snapshot["counters"]:
+        with st.expander("Counters"):
+            st.dataframe(pd.DataFrame(sorted(snapshot["counters"].items()), columns=["Name", "Count"]),
+                         use_container_width=True, hide_index=True)
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        st.download_button("Download JSON", json.dumps(snapshot, indent=2, default=str),
+                           file_name="metrics.json", mime="application/json")
+    with col2:
+        st.download_button("Download Prometheus", metrics.to_prometheus(snapshot),
+                           file_name="metrics.prom", mime="text/plain")
+    with col3:
+        if st.button("Reset timings"):
+            metrics.reset()
+            st.rerun()
+
+def _percent(value):
+    return f"{value:.0%}" if isinstance(value, (int, float)) else "n/a"
+
+instrument_module(sys.modules[__name__], "view.performance")